@@ -0,0 +1,227 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+import unittest
+from array import array
+from typing import List
+
+from cell import Cell
+from masks import MASK_VALUES, SINGLE_VALUE, VALUE_BITS, values_to_mask
+from sudoku import Sudoku
+
+
+class BoardRowView:
+    """
+    List-like view of a single row of a BitboardSudoku
+    Reading a cell returns a (new) list of possible values, assigning a cell updates the mask
+    """
+    def __init__(self, sudoku, row):
+        self.sudoku = sudoku
+        self.row = row
+
+    def __getitem__(self, col):
+        return self.sudoku.get_values(self.row, col)
+
+    def __setitem__(self, col, values):
+        self.sudoku.set_values(self.row, col, values)
+
+    def __len__(self):
+        return 9
+
+    def __iter__(self):
+        for col in range(9):
+            yield self.sudoku.get_values(self.row, col)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class BoardView:
+    """
+    Read/write view that makes a BitboardSudoku look like the board[row][col][values] list used by Sudoku
+    Only for legacy callers (tests, is_valid_cell_value), every read builds new lists, so the solvers
+    and rules use the masks and counters instead (get_mask, Sudoku.is_value_allowed)
+    NOTE: values read through the view are copies, so board[row][col].remove(x) does not update the board,
+    use Sudoku.remove_value or assign board[row][col] = [...] instead
+    """
+    def __init__(self, sudoku):
+        self.sudoku = sudoku
+
+    def __getitem__(self, row):
+        return BoardRowView(self.sudoku, row)
+
+    def __len__(self):
+        return 9
+
+    def __iter__(self):
+        for row in range(9):
+            yield BoardRowView(self.sudoku, row)
+
+    def __eq__(self, other):
+        return [list(row) for row in self] == [list(row) for row in other]
+
+    def __repr__(self):
+        return repr([list(row) for row in self])
+
+
+class BitboardSudoku(Sudoku):
+    """
+    Sudoku board where each cell's domain is a 9-bit candidate mask (see masks.py)
+    The masks are held in a flat 81 slot array indexed by row * 9 + col
+
+    Works through the same public API as Sudoku (get_values, set_values, remove_value, solve_cell, print, ...)
+    so the inference rules and solvers can use either board.
+    board[row][col] is still available through a BoardView for existing callers
+    """
+
+    @property
+    def board(self):
+        return BoardView(self)
+
+    @board.setter
+    def board(self, board):
+        """
+        Load the masks from a board[row][col][values] list (as built by build_board_from_str)
+        """
+        self.masks = array('H', [values_to_mask(values) for row in board for values in row])
+        self.owned_masks = True                 # False while the masks are shared with a fork
+
+    def get_values(self, row, col) -> List[int]:
+        return list(MASK_VALUES[self.masks[row * 9 + col]])
+
+    def get_mask(self, row, col) -> int:
+        return self.masks[row * 9 + col]
+
+    def set_values(self, row, col, values):
+        index = row * 9 + col
+        old_mask = self.masks[index]
+        new_mask = values_to_mask(values)
+        if old_mask == new_mask:
+            return
+        if not self.owned_masks:
+            self.unshare_masks()
+        self.masks[index] = new_mask
+        self.cell_changed(index, old_mask, new_mask)
+
+    def remove_value(self, row, col, value):
+        index = row * 9 + col
+        bit = VALUE_BITS[value]
+        mask = self.masks[index]
+        if not mask & bit:
+            return False
+        if not self.owned_masks:
+            self.unshare_masks()
+        self.masks[index] = mask & ~bit
+        self.cell_changed(index, mask, mask & ~bit)
+        return True
+
+    def restore_mask(self, index, mask):
+        if not self.owned_masks:
+            self.unshare_masks()
+        self.masks[index] = mask
+
+    def unshare_masks(self):
+        """
+        Give this board its own copy of the masks it shares with a fork (copy on write)
+        The whole array is copied at once, it is only 81 slots
+        """
+        self.masks = array('H', self.masks)
+        self.owned_masks = True
+
+    def share_board(self, new):
+        self.owned_masks = False
+        new.owned_masks = False
+
+    def get_bt_puzzle(self):
+        masks = self.masks
+        return [[SINGLE_VALUE[masks[row * 9 + col]] for col in range(9)] for row in range(9)]
+
+
+class TestBitboardSudoku(unittest.TestCase):
+    puzzle_str = '''240 300 000
+                    000 520 407
+                    000 046 008
+                    610 700 084
+                    009 060 500
+                    730 005 061
+                    100 470 000
+                    302 051 000
+                    000 002 019'''
+
+    def test_same_as_list_board(self):
+        """
+        Both backends should produce the same candidates, printout and backtracking puzzle
+        """
+        expected = Sudoku(self.puzzle_str)
+        actual = BitboardSudoku(self.puzzle_str)
+
+        self.assertEqual(expected.board, [list(row) for row in actual.board])
+        self.assertEqual(expected.print(simple=False), actual.print(simple=False))
+        self.assertEqual(expected.get_bt_puzzle(), actual.get_bt_puzzle())
+        self.assertEqual(expected.get_solved_cell_count(), actual.get_solved_cell_count())
+
+    def test_board_view(self):
+        """
+        Writes through board[row][col] update the masks
+        """
+        sudoku = BitboardSudoku(self.puzzle_str)
+        sudoku.board[0][2] = [1, 5]
+        self.assertEqual(sudoku.get_mask(0, 2), 0b10001)
+        self.assertEqual(sudoku.board[0][2], [1, 5])
+        self.assertTrue(sudoku.remove_value(0, 2, 5))
+        self.assertFalse(sudoku.remove_value(0, 2, 5))
+        self.assertEqual(sudoku.get_row(0)[2], Cell(0, 2, [1]))
+
+    def test_fork(self):
+        """
+        Changes to a fork do not show up in the original and vice versa
+        """
+        sudoku = BitboardSudoku(self.puzzle_str)
+        expected = sudoku.print(simple=False)
+        fork = sudoku.fork()
+        self.assertIs(sudoku.masks, fork.masks)         # shared until one of them changes
+
+        fork.set_values(0, 2, [1])
+        fork.solve_cell(Cell(0, 2, 1))
+        self.assertEqual(expected, sudoku.print(simple=False))
+        self.assertEqual(sudoku.get_solved_cell_count() + 1, fork.get_solved_cell_count())
+
+        sudoku.remove_value(0, 2, 5)
+        self.assertEqual([1], fork.get_values(0, 2))
+
+    def test_rules(self):
+        """
+        Run every inference rule on both backends and verify the boards match
+        """
+        from hidden_pairs import HiddenPairs
+        from hidden_singles import HiddenSingles
+        from hidden_triples import HiddenTriples
+        from naked_pairs import NakedPairs
+        from naked_singles import NakedSingles
+        from naked_triples import NakedTriples
+
+        hard_str = '''170 000 006
+                      006 090 040
+                      300 070 000
+                      000 900 030
+                      094 020 870
+                      030 005 000
+                      000 060 001
+                      080 010 500
+                      500 000 082'''
+        expected = Sudoku(hard_str)
+        actual = BitboardSudoku(hard_str)
+        for rule in [NakedSingles, HiddenSingles, NakedPairs, HiddenPairs, NakedTriples, HiddenTriples]:
+            self.assertEqual(rule().evaluate(expected), rule().evaluate(actual))
+            self.assertEqual(expected.board, [list(row) for row in actual.board])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,13 +9,17 @@ import time
 import unittest
 from collections import defaultdict
 
-import utility
+from dlx import solve_dlx
 from naked_singles import NakedSingles
+from search import count_solutions
+from fish import FISH_RULES
 from hidden_singles import HiddenSingles
+from locked_candidates import LockedCandidates
 from simple_BT import solve_simple_BT
 from solve_no_BT import solve_no_BT
 from sudoku import Sudoku
 from most_constrained import *
+from utility import SolveStats
 
 puzzle_file = 'puzzles.txt'
 
@@ -50,6 +54,14 @@ class SudokuDataCollection(unittest.TestCase):
                 else:
                     puzzle_str += line
 
+    def test_unique_solutions(self):
+        """
+        Every puzzle in puzzles.txt should have exactly one solution
+        """
+        rules = [NakedSingles, HiddenSingles, NakedPairs, HiddenPairs]
+        for puzzle_name, puzzle_str in self.puzzles.items():
+            self.assertEqual(1, count_solutions(Sudoku(puzzle_str), rules=rules), puzzle_name)
+
     def test_algos(self):
         '''
         Load puzzles.txt
@@ -73,8 +85,7 @@ class SudokuDataCollection(unittest.TestCase):
         # print('after constraints initialized')
 
         print('after constraints initialized')
-        ns = NakedSingles(sudoku)
-        ns.evaluate()
+        NakedSingles().evaluate(sudoku)
         sudoku.print(simple=False)
         sudoku.print()
         self.assertTrue(sudoku.is_board_solved())
@@ -103,15 +114,15 @@ class SudokuDataCollection(unittest.TestCase):
             start_count = sudoku.get_solved_cell_count()
             # record the naked singles, hidden singles, pairs, triples from the solve
             # (ns, hs, np, hp, nt, ht) = sudoku.solve(level=4)            # run at max level
-            utility.counter = 0
+            stats = SolveStats()
             # solved_sudoku = solve_most_constrained_var(sudoku)
             # sudoku.print()
-            solved_sudoku = solve_simple_BT(sudoku)
+            solved_sudoku = solve_simple_BT(sudoku, stats=stats)
             # solved_sudoku.print()
             end_count = solved_sudoku.get_solved_cell_count()
 
             pct = 100 * end_count / 81
-            print(f'{puzzle:15s} {utility.counter=} {start_count:2d} {end_count:2d} {pct:2.0f}%')
+            print(f'{puzzle:15s} {stats.nodes=} {start_count:2d} {end_count:2d} {pct:2.0f}%')
             # csv_report += f'{puzzle},{start_count},{end_count},{end_count-start_count},{pct},{ns},{hs},{np},{hp},{nt},{ht}\n'
 
             if end_count == 81:
@@ -183,9 +194,8 @@ class SudokuDataCollection(unittest.TestCase):
                     # solve puzzle
                     sudoku = Sudoku(self.puzzles[puzzle_name])
 
-                    utility.counter = 0
-                    utility.rule_tracker.reset()
-                    solution = solve_most_constrained_var(sudoku, rules=level_rules)
+                    stats = SolveStats()
+                    solution = solve_most_constrained_var(sudoku, rules=level_rules, stats=stats)
                     assert solution.is_board_solved()
                     # solution = solve_most_constrained_var(sudoku, rules=level_rules)
                     # assert solution.is_board_solved()
@@ -193,20 +203,20 @@ class SudokuDataCollection(unittest.TestCase):
 
                     runtime_sum_mcv += end - start
 
-                    sum_backtracks_mcv += utility.counter
+                    sum_backtracks_mcv += stats.nodes
 
-                    sum_ns += utility.rule_tracker.naked_singles
-                    sum_hs += utility.rule_tracker.hidden_singles
-                    sum_np += utility.rule_tracker.naked_pairs
-                    sum_hp += utility.rule_tracker.hidden_pairs
-                    sum_nt += utility.rule_tracker.naked_triples
-                    sum_ht += utility.rule_tracker.hidden_triples
+                    sum_ns += stats.rule_moves[NakedSingles.name]
+                    sum_hs += stats.rule_moves[HiddenSingles.name]
+                    sum_np += stats.rule_moves[NakedPairs.name]
+                    sum_hp += stats.rule_moves[HiddenPairs.name]
+                    sum_nt += stats.rule_moves[NakedTriples.name]
+                    sum_ht += stats.rule_moves[HiddenTriples.name]
 
                     start = time.time()
-                    utility.counter = 0
+                    stats = SolveStats()
                     bt = Sudoku(self.puzzles[puzzle_name])
-                    solved_sudoku = solve_simple_BT(bt, rules=level_rules)
-                    sum_backtracks_bt += utility.counter
+                    solved_sudoku = solve_simple_BT(bt, rules=level_rules, stats=stats)
+                    sum_backtracks_bt += stats.nodes
                     end = time.time()
                     runtime_sum_bt += end - start
 
@@ -333,7 +343,6 @@ class SudokuDataCollection(unittest.TestCase):
 
                 start = time.time()  # get start time
                 # solve puzzle
-                utility.counter = 0
                 sudoku = Sudoku(self.puzzles[puzzle_name])
                 solution = solve_most_constrained_var(sudoku, rules=[])
                 sum_backtracks_mcv = 0
@@ -342,10 +351,10 @@ class SudokuDataCollection(unittest.TestCase):
                 runtime_sum_mcv += end - start
 
                 start = time.time()  # get start time
-                utility.counter = 0
+                stats = SolveStats()
                 bt = Sudoku(self.puzzles[puzzle_name])
-                solved_sudoku = solve_simple_BT(bt)
-                sum_backtracks_bt += utility.counter
+                solved_sudoku = solve_simple_BT(bt, stats=stats)
+                sum_backtracks_bt += stats.nodes
 
                 end = time.time()
                 runtime_sum_bt += end - start
@@ -408,6 +417,129 @@ class SudokuDataCollection(unittest.TestCase):
             row += ' & %2.0f \\%%' % pct
         print(f'{row} \\\\')
 
+    def test_report_locked_candidates(self):
+        """
+        Compare each rule level with and without LockedCandidates added at the end
+        """
+        print('Locked Candidates')
+        self.report_extra_rules([LockedCandidates], 'LC')
+
+    def test_report_fish(self):
+        """
+        Compare each rule level with and without the fish rules (X-Wing, Swordfish, Jellyfish) added at the end
+        """
+        print('Fish')
+        self.report_extra_rules(FISH_RULES, 'Fish')
+
+    def test_report_dlx(self):
+        """
+        Compare the Dancing Links solver with the most constrained variable solver using all six rules
+        Prints the average nodes, backtracks and time per puzzle for each difficulty
+        """
+        all_difficulties = ['Easy', 'Medium', 'Hard', 'Evil']
+        six_rules = [NakedSingles, HiddenSingles, NakedPairs, HiddenPairs, NakedTriples, HiddenTriples]
+        solvers = [('dlx', solve_dlx, []),
+                   ('mcv', solve_most_constrained_var, []),
+                   ('mcv six rules', solve_most_constrained_var, six_rules)]
+
+        print('Dancing Links')
+        for solver_name, solver, rules in solvers:
+            row = solver_name
+            for difficulty in all_difficulties:
+                puzzle_count = 0
+                totals = SolveStats()
+                for puzzle_name in self.puzzles.keys():
+                    if difficulty not in puzzle_name:
+                        continue
+
+                    puzzle_count += 1
+                    stats = SolveStats()
+                    solution = solver(Sudoku(self.puzzles[puzzle_name]), rules=rules, stats=stats)
+                    assert solution.is_board_solved()
+                    totals.nodes += stats.nodes
+                    totals.backtracks += stats.backtracks
+                    totals.elapsed += stats.elapsed
+
+                row += ' & %1.1f & %1.1f & %1.4f' % (totals.nodes / puzzle_count, totals.backtracks / puzzle_count,
+                                                     totals.elapsed / puzzle_count)
+            print(f'{row} \\\\')
+
+    def test_report_value_order(self):
+        """
+        Compare trying values in ascending order with least constraining value first at each rule level
+        Prints the average nodes and time per puzzle for both solvers
+        """
+        all_difficulties = ['Easy', 'Medium', 'Hard', 'Evil']
+        all_setting_rules = [
+            [],
+            [NakedSingles, HiddenSingles],
+            [NakedSingles, HiddenSingles, NakedPairs, HiddenPairs],
+            [NakedSingles, HiddenSingles, NakedPairs, HiddenPairs, NakedTriples, HiddenTriples],
+        ]
+        solvers = [('bt', solve_simple_BT), ('mcv', solve_most_constrained_var)]
+
+        print('Value Order')
+        for level in range(4):
+            for value_order in [ASCENDING, LEAST_CONSTRAINING]:
+                for solver_name, solver in solvers:
+                    row = f'Level {level} {value_order} {solver_name}'
+                    for difficulty in all_difficulties:
+                        puzzle_count = 0
+                        sum_nodes = 0
+                        sum_time = 0.
+                        for puzzle_name in self.puzzles.keys():
+                            if difficulty not in puzzle_name:
+                                continue
+
+                            puzzle_count += 1
+                            stats = SolveStats()
+                            solution = solver(Sudoku(self.puzzles[puzzle_name]), rules=all_setting_rules[level],
+                                              stats=stats, value_order=value_order)
+                            assert solution.is_board_solved()
+                            sum_nodes += stats.nodes
+                            sum_time += stats.elapsed
+
+                        row += ' & %1.1f & %1.4f' % (sum_nodes / puzzle_count, sum_time / puzzle_count)
+                    print(f'{row} \\\\')
+
+    def report_extra_rules(self, extra_rules, label):
+        """
+        Solve every puzzle at each rule level with and without extra_rules added at the end
+        Prints the average backtracks and time per puzzle for both solvers
+        """
+        all_difficulties = ['Easy', 'Medium', 'Hard', 'Evil']
+        all_setting_rules = [
+            [],
+            [NakedSingles, HiddenSingles],
+            [NakedSingles, HiddenSingles, NakedPairs, HiddenPairs],
+            [NakedSingles, HiddenSingles, NakedPairs, HiddenPairs, NakedTriples, HiddenTriples],
+        ]
+        solvers = [('bt', solve_simple_BT), ('mcv', solve_most_constrained_var)]
+
+        for level in range(4):
+            for extra in [False, True]:
+                level_rules = all_setting_rules[level] + (extra_rules if extra else [])
+                for solver_name, solver in solvers:
+                    row = f'Level {level}{" + " + label if extra else ""} {solver_name}'
+                    for difficulty in all_difficulties:
+                        puzzle_count = 0
+                        sum_backtracks = 0
+                        sum_time = 0.
+                        for puzzle_name in self.puzzles.keys():
+                            # each puzzle is named like '10 Hard' so use the name to see if it is the difficulty we're testing
+                            if difficulty not in puzzle_name:
+                                continue
+
+                            puzzle_count += 1
+                            stats = SolveStats()
+                            solution = solver(Sudoku(self.puzzles[puzzle_name]), rules=level_rules, stats=stats)
+                            assert solution.is_board_solved()
+                            sum_backtracks += stats.backtracks
+                            sum_time += stats.elapsed
+
+                        row += ' & %1.1f & %1.4f' % (sum_backtracks / puzzle_count, sum_time / puzzle_count)
+                    print(f'{row} \\\\')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,262 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+"""
+Dancing Links (Knuth's Algorithm X) exact cover solver
+
+Sudoku as exact cover: each choice "value v at row r, col c" is a row of the matrix that covers 4 columns
+    cell r,c has a value, row r has v, col c has v, region of r,c has v
+A solution is a set of 81 choices that covers each of the 324 columns exactly once.
+Only the values still possible on the board are added as choices, so givens and any inference
+already done on the board shrink the matrix.
+
+solve_dlx takes the same arguments as the other solvers (see most_constrained.py) so it can be swapped in
+"""
+import unittest
+from typing import List
+
+from cell import Cell
+from inference import InferenceRule
+from masks import MASK_VALUES
+from sudoku import CONTRADICTION, Sudoku
+from units import COORDS, REGION_OF
+from utility import BUDGET_EXCEEDED, Budget, CancelToken, SolveStats
+
+COLUMN_COUNT = 4 * 81
+
+
+def choice_columns(row, col, value):
+    """
+    Return the 4 matrix columns (0-323) covered by placing value at row,col
+    """
+    return (row * 9 + col,
+            81 + row * 9 + value - 1,
+            162 + col * 9 + value - 1,
+            243 + REGION_OF[row * 9 + col] * 9 + value - 1)
+
+
+class DancingLinks:
+    """
+    Sparse 0/1 matrix stored as circular doubly linked lists in flat arrays (node 0 is the root,
+    nodes 1...column_count are the column headers, the rest are the 1s of the matrix rows)
+    Covering a column unlinks it and every row that has a 1 in it, uncovering puts them back in reverse
+    """
+
+    def __init__(self, column_count):
+        count = column_count + 1
+        self.left = [index - 1 for index in range(count)]
+        self.right = [index + 1 for index in range(count)]
+        self.left[0] = column_count
+        self.right[column_count] = 0
+        self.up = list(range(count))
+        self.down = list(range(count))
+        self.column = list(range(count))
+        self.row_id = [None] * count
+        self.size = [0] * count                 # number of 1s left in each column
+
+    def add_row(self, row_id, columns):
+        """
+        Add a row with 1s in the given columns (0 based), row_id is returned by search for the chosen rows
+        """
+        first = None
+        for column in columns:
+            header = column + 1
+            node = len(self.column)
+            # insert at the bottom of the column
+            self.column.append(header)
+            self.row_id.append(row_id)
+            self.up.append(self.up[header])
+            self.down.append(header)
+            self.down[self.up[header]] = node
+            self.up[header] = node
+            self.size[header] += 1
+            # insert at the end of the row
+            if first is None:
+                first = node
+                self.left.append(node)
+                self.right.append(node)
+            else:
+                self.left.append(self.left[first])
+                self.right.append(first)
+                self.right[self.left[first]] = node
+                self.left[first] = node
+
+    def cover(self, header):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        row = down[header]
+        while row != header:
+            node = right[row]
+            while node != row:
+                down[up[node]] = down[node]
+                up[down[node]] = up[node]
+                size[column[node]] -= 1
+                node = right[node]
+            row = down[row]
+
+    def uncover(self, header):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        row = up[header]
+        while row != header:
+            node = left[row]
+            while node != row:
+                size[column[node]] += 1
+                down[up[node]] = node
+                up[down[node]] = node
+                node = left[node]
+            row = up[row]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def search(self, stats: SolveStats, depth=0, budget: Budget = None):
+        """
+        Algorithm X: cover the column with the fewest 1s and try each of its rows
+        Return the row ids of an exact cover, None if there is none or BUDGET_EXCEEDED if a limit of
+        the budget was reached first (the matrix is left part way through the search)
+        """
+        if budget is not None and not budget.check(stats):
+            return BUDGET_EXCEEDED
+        stats.record_node(depth)
+        right, down = self.right, self.down
+        if right[0] == 0:
+            return []                           # every column is covered
+
+        # pick the column with the fewest rows left (same idea as most constrained variable)
+        header = right[0]
+        best = header
+        while header != 0:
+            if self.size[header] < self.size[best]:
+                best = header
+                if self.size[best] < 2:
+                    break
+            header = right[header]
+        if self.size[best] == 0:
+            return None
+
+        self.cover(best)
+        row = down[best]
+        while row != best:
+            node = right[row]
+            while node != row:
+                self.cover(self.column[node])
+                node = right[node]
+
+            solution = self.search(stats, depth + 1, budget)
+            if solution == BUDGET_EXCEEDED:
+                return solution
+            if solution is not None:
+                # leave the matrix covered, it is not used again after a solution is found
+                solution.append(self.row_id[row])
+                return solution
+
+            node = self.left[row]
+            while node != row:
+                self.uncover(self.column[node])
+                node = self.left[node]
+            stats.record_backtrack()
+            row = down[row]
+
+        self.uncover(best)
+        return None
+
+
+def solve_dlx(sudoku, rules: List[InferenceRule] = [], stats: SolveStats = None,
+              max_nodes=None, deadline=None, cancel: CancelToken = None):
+    """
+    Solve the board (a Sudoku or a puzzle string) with Dancing Links
+    Return the solved board or -1 if there is no solution, like the other solvers the board is solved in place
+    rules are not used (the exact cover search does its own propagation), the argument is here so
+    solve_dlx can be used wherever solve_most_constrained_var is
+    Pass a SolveStats object to collect the node/backtrack counters and time
+    max_nodes, deadline and cancel limit the search (see utility.Budget), the board is not changed if one is reached
+    """
+    if isinstance(sudoku, str):
+        sudoku = Sudoku(sudoku)
+    if stats is None:
+        stats = SolveStats()
+    stats.start()
+    try:
+        if sudoku.status() == CONTRADICTION:
+            return -1
+
+        matrix = DancingLinks(COLUMN_COUNT)
+        for row, col in COORDS:
+            for value in MASK_VALUES[sudoku.get_mask(row, col)]:
+                matrix.add_row((row, col, value), choice_columns(row, col, value))
+
+        solution = matrix.search(stats, budget=Budget(max_nodes, deadline, cancel))
+        if solution is None:
+            return -1
+        if solution == BUDGET_EXCEEDED:
+            return solution
+
+        for row, col, value in solution:
+            sudoku.set_values(row, col, [value])
+            sudoku.solve_cell(Cell(row, col, value))
+        return sudoku
+    finally:
+        stats.stop()
+
+
+class TestDancingLinks(unittest.TestCase):
+    def test_exact_cover(self):
+        """
+        Knuth's example: rows 1, 4 and 5 (0 based 0, 3, 4) are the only exact cover
+        """
+        matrix = DancingLinks(7)
+        for row_id, columns in enumerate([[2, 4, 5], [0, 3, 6], [1, 2, 5], [0, 3], [1, 6], [3, 4, 6]]):
+            matrix.add_row(row_id, columns)
+        self.assertEqual([0, 3, 4], sorted(matrix.search(SolveStats())))
+
+        # without row 4 nothing covers column 1 and 6 together, every branch has to be undone
+        matrix = DancingLinks(7)
+        for row_id, columns in enumerate([[2, 4, 5], [0, 3, 6], [1, 2, 5], [0, 3], [3, 4, 6]]):
+            matrix.add_row(row_id, columns)
+        stats = SolveStats()
+        self.assertIsNone(matrix.search(stats))
+        self.assertGreater(stats.backtracks, 0)
+
+    def test_solve(self):
+        from most_constrained import EVIL_SUDOKU, solve_most_constrained_var
+        stats = SolveStats()
+        solved = solve_dlx(EVIL_SUDOKU, stats=stats)
+        self.assertTrue(solved.is_board_solved())
+        self.assertEqual(solve_most_constrained_var(Sudoku(EVIL_SUDOKU)).get_bt_puzzle(), solved.get_bt_puzzle())
+        self.assertGreaterEqual(stats.nodes, 82 - 25)     # at least one node per blank cell + the final one
+
+    def test_budget(self):
+        from most_constrained import EVIL_SUDOKU
+        stats = SolveStats()
+        sudoku = Sudoku(EVIL_SUDOKU)
+        self.assertEqual(BUDGET_EXCEEDED, solve_dlx(sudoku, stats=stats, max_nodes=5))
+        self.assertEqual((5, 'max_nodes'), (stats.nodes, stats.exceeded))
+        self.assertEqual(Sudoku(EVIL_SUDOKU).get_bt_puzzle(), sudoku.get_bt_puzzle())
+
+    def test_no_solution(self):
+        """
+        1 can not go anywhere in row 0 (cols 0-5 have a 1 further down, the rest had it removed)
+        """
+        sudoku = Sudoku('''000 000 000
+                           000 000 000
+                           000 000 000
+                           100 000 000
+                           010 000 000
+                           001 000 000
+                           000 100 000
+                           000 010 000
+                           000 001 000''')
+        sudoku.remove_value(0, 6, 1)
+        sudoku.remove_value(0, 7, 1)
+        sudoku.remove_value(0, 8, 1)
+        stats = SolveStats()
+        self.assertEqual(-1, solve_dlx(sudoku, stats=stats))
+        self.assertEqual(0, stats.nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()
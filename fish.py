@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+"""
+Fish rules (X-Wing, Swordfish, Jellyfish), an optional tier on top of the six basic rules:
+    rules = [NakedSingles, HiddenSingles, NakedPairs, HiddenPairs, NakedTriples, HiddenTriples] + FISH_RULES
+
+A fish of size n for one value is n rows where the value can only go in the same n cols
+(or n cols where it can only go in the same n rows). The value has to be placed once in each of
+those rows, which uses up the n cols, so it can be removed from the rest of those cols.
+
+This is a naked subset (see subsets.py) on the rows' position masks of the value, with the rows
+as the cells and the cols as the values, so the same search is used.
+"""
+import unittest
+
+from inference import InferenceRule
+from masks import MASK_POSITIONS
+from subsets import find_naked_subset, subset_changes
+
+
+class Fish(InferenceRule):
+    """
+    Fish of a given size (2 to 4), subclasses only set the name and size
+    """
+    name = 'fish'
+    size = 2
+
+    def evaluate(self, puzzle):
+        """
+        Look for fish of every value, with rows and with cols as the base lines, until nothing changes
+        Return the number of moves, one for every value and base that changed the board
+        """
+        move_count = 0
+        cell_changed = True  # run init at least once
+        while cell_changed:  # keep running when a change is made
+            cell_changed = False  # this ensures a change is made every loop
+
+            # a fish spans every row and col, skip the pass if none of them changed since the last one
+            dirty = [puzzle.is_unit_dirty(self, unit) for unit in range(18)]
+            if not any(dirty):
+                return move_count
+
+            for value in range(1, 10):
+                for base in [0, 9]:             # rows (units 0-8) or cols (units 9-17) as the base lines
+                    if not puzzle.is_consistent():
+                        return move_count
+                    if self.execute_fish(puzzle, value, base):
+                        move_count += 1
+                        cell_changed = True
+
+        return move_count
+
+    def execute_fish(self, puzzle, value, base):
+        """
+        Find fish of value with base lines starting at unit base (0 for rows, 9 for cols)
+        and remove the value from the rest of the cover lines
+        Return True if a value was removed, else False
+        """
+        # masks[line] -> positions along the base line where value can go (cols for a row, rows for a col)
+        masks = [puzzle.get_positions(base + line, value) for line in range(9)]
+
+        value_removed = False
+        fish = find_naked_subset(masks, self.size)
+        while fish is not None:
+            for line, new_mask in subset_changes(masks, fish[0], fish[1], False):
+                for position in MASK_POSITIONS[masks[line] & ~new_mask]:
+                    if base == 0:
+                        puzzle.remove_value(line, position, value)
+                    else:
+                        puzzle.remove_value(position, line, value)
+                masks[line] = new_mask
+                value_removed = True
+            fish = find_naked_subset(masks, self.size)
+
+        return value_removed
+
+
+class XWing(Fish):
+    name = 'x_wing'
+    size = 2
+
+
+class Swordfish(Fish):
+    name = 'swordfish'
+    size = 3
+
+
+class Jellyfish(Fish):
+    name = 'jellyfish'
+    size = 4
+
+
+FISH_RULES = [XWing, Swordfish, Jellyfish]
+
+
+class TestFish(unittest.TestCase):
+    def test_x_wing(self):
+        """
+        3 can only go in cols 2 and 7 of rows 1 and 6, so it is removed from the rest of cols 2 and 7
+        """
+        from sudoku import Sudoku
+        sudoku = Sudoku()
+        for row in [1, 6]:
+            for col in range(9):
+                if col not in [2, 7]:
+                    sudoku.remove_value(row, col, 3)
+
+        self.assertEqual(1, XWing().evaluate(sudoku))
+        for col in [2, 7]:
+            self.assertEqual([1, 6], [row for row in range(9) if 3 in sudoku.get_values(row, col)])
+        self.assertTrue(3 in sudoku.get_values(0, 0))
+
+    def test_swordfish_cols(self):
+        """
+        8 can only go in rows 0, 4 and 8 of cols 1, 3 and 5 (not every col has all 3), so it is removed
+        from the rest of rows 0, 4 and 8. Counted in the solve statistics under the rule's name
+        """
+        from sudoku import Sudoku
+        from utility import SolveStats
+        sudoku = Sudoku()
+        for col, rows in [(1, [0, 4]), (3, [4, 8]), (5, [0, 4, 8])]:
+            for row in range(9):
+                if row not in rows:
+                    sudoku.remove_value(row, col, 8)
+
+        stats = SolveStats()
+        self.assertEqual(0, XWing().apply(sudoku, stats))
+        Swordfish().apply(sudoku, stats)
+        for row, cols in [(0, [1, 5]), (4, [1, 3, 5]), (8, [3, 5])]:
+            self.assertEqual(cols, [col for col in range(9) if 8 in sudoku.get_values(row, col)])
+        self.assertEqual(1, stats.rule_fires['swordfish'])
+        self.assertEqual(0, stats.rule_fires['x_wing'])
+        self.assertTrue(sudoku.is_consistent())
+
+
+if __name__ == '__main__':
+    unittest.main()
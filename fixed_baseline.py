@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+"""
+Fixed baseline backtracking on the plain 2D grid (see Sudoku.get_bt_puzzle), no inference rules
+
+Blank cells are filled in row order with the lowest digit that is not used yet in the cell's
+row, col or region. The used digits are kept as a 9-bit mask (see masks.py) per row, col and
+region, so checking a digit is a few bit operations instead of scanning the grid.
+The search keeps its own stack (the digits left to try at each blank cell) instead of recursing.
+"""
+import unittest
+
+from masks import ALL_VALUES, SINGLE_VALUE, VALUE_BITS
+from units import REGION_OF
+from utility import BUDGET_EXCEEDED, Budget, CancelToken, SolveStats
+
+
+def backtrack_grid(grid, max_solutions=1, stats: SolveStats = None,
+                   max_nodes=None, deadline=None, cancel: CancelToken = None):
+    """
+    Fill the blank (0) cells of grid, a 9x9 list of rows of digits, in fixed row-wise order
+    Stop after max_solutions solutions have been found (None to count them all)
+    Return the number of solutions found, grid is left holding the first solution (unchanged if there is none)
+    Pass a SolveStats object to collect the node/backtrack counters and time
+    max_nodes, deadline and cancel limit the search (see utility.Budget), the grid is not changed if one is reached
+    """
+    if stats is None:
+        stats = SolveStats()
+    budget = Budget(max_nodes, deadline, cancel)
+    stats.start()
+    try:
+        row_used = [0] * 9
+        col_used = [0] * 9
+        region_used = [0] * 9
+        blanks = []                             # (row, col, region) of each blank cell in search order
+        for row in range(9):
+            for col in range(9):
+                region = REGION_OF[row * 9 + col]
+                value = grid[row][col]
+                if value == 0:
+                    blanks.append((row, col, region))
+                    continue
+                bit = VALUE_BITS[value]
+                if (row_used[row] | col_used[col] | region_used[region]) & bit:
+                    return 0                    # a given digit is repeated
+                row_used[row] |= bit
+                col_used[col] |= bit
+                region_used[region] |= bit
+
+        if not blanks:
+            return 1
+
+        first_solution = None
+        solutions = 0
+        # untried[depth] -> digits (as a mask) still to try at blank cell depth
+        untried = [0] * len(blanks)
+        row, col, region = blanks[0]
+        untried[0] = ALL_VALUES & ~(row_used[row] | col_used[col] | region_used[region])
+        depth = 0
+        while depth >= 0:
+            row, col, region = blanks[depth]
+
+            # take back the digit placed here before (the branch below it is done)
+            value = grid[row][col]
+            if value:
+                bit = VALUE_BITS[value]
+                row_used[row] ^= bit
+                col_used[col] ^= bit
+                region_used[region] ^= bit
+                grid[row][col] = 0
+
+            remaining = untried[depth]
+            if not remaining:
+                depth -= 1
+                if depth >= 0:
+                    stats.record_backtrack()
+                continue
+
+            if not budget.check(stats):
+                for row, col, region in blanks:
+                    grid[row][col] = 0
+                return BUDGET_EXCEEDED
+
+            # place the lowest untried digit
+            bit = remaining & -remaining
+            untried[depth] = remaining ^ bit
+            grid[row][col] = SINGLE_VALUE[bit]
+            row_used[row] |= bit
+            col_used[col] |= bit
+            region_used[region] |= bit
+            stats.record_node(depth + 1)
+
+            if depth + 1 == len(blanks):
+                solutions += 1
+                if first_solution is None:
+                    first_solution = [list(grid_row) for grid_row in grid]
+                if solutions == max_solutions:
+                    break
+                continue                        # try the next digit at this same cell
+
+            depth += 1
+            row, col, region = blanks[depth]
+            untried[depth] = ALL_VALUES & ~(row_used[row] | col_used[col] | region_used[region])
+
+        if first_solution is not None:
+            grid[:] = first_solution
+        return solutions
+    finally:
+        stats.stop()
+
+
+class TestFixedBaseline(unittest.TestCase):
+    PUZZLE = [
+        [0, 0, 2, 0, 9, 0, 6, 0, 0],
+        [6, 0, 9, 0, 0, 0, 0, 0, 0],
+        [4, 8, 0, 0, 0, 6, 0, 0, 0],
+        [0, 0, 8, 4, 0, 2, 0, 9, 0],
+        [3, 0, 0, 0, 0, 0, 0, 0, 7],
+        [0, 7, 0, 3, 0, 9, 1, 0, 0],
+        [0, 0, 0, 6, 0, 0, 0, 5, 1],
+        [0, 0, 0, 0, 0, 0, 2, 0, 4],
+        [0, 0, 7, 0, 8, 0, 3, 0, 0]
+    ]
+
+    def test_first_solution(self):
+        """
+        The search stops at the first solution and leaves it in the grid
+        """
+        from sudoku import Sudoku
+        grid = [list(row) for row in self.PUZZLE]
+        stats = SolveStats()
+        self.assertEqual(1, backtrack_grid(grid, stats=stats))
+        solved = Sudoku(''.join(str(value) for row in grid for value in row))
+        self.assertTrue(solved.is_board_solved())
+        for row in range(9):
+            for col in range(9):
+                if self.PUZZLE[row][col]:
+                    self.assertEqual(self.PUZZLE[row][col], grid[row][col])
+        self.assertGreater(stats.backtracks, 0)
+
+    def test_solution_count(self):
+        """
+        Take out givens so the puzzle has more than one solution, the grid keeps the first one
+        """
+        grid = [list(row) for row in self.PUZZLE]
+        grid[0][2] = grid[0][4] = grid[0][6] = 0
+        first = [list(row) for row in grid]
+        self.assertEqual(1, backtrack_grid(first))
+        self.assertEqual(2, backtrack_grid(grid, max_solutions=2))
+        self.assertEqual(first, grid)
+
+    def test_budget(self):
+        grid = [list(row) for row in self.PUZZLE]
+        stats = SolveStats()
+        self.assertEqual(BUDGET_EXCEEDED, backtrack_grid(grid, stats=stats, max_nodes=1000))
+        self.assertEqual((1000, 'max_nodes'), (stats.nodes, stats.exceeded))
+        self.assertEqual(self.PUZZLE, grid)
+
+    def test_no_solution(self):
+        grid = [list(row) for row in self.PUZZLE]
+        grid[0][0] = 2                          # repeats the 2 given in row 0
+        self.assertEqual(0, backtrack_grid(grid))
+        grid[0][0] = 0
+        grid[0][1] = 1
+        grid[0][3] = 5                          # consistent givens, but no solution
+        expected = [list(row) for row in grid]
+        self.assertEqual(0, backtrack_grid(grid, max_solutions=None))
+        self.assertEqual(expected, grid)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,116 +1,47 @@
 #!/usr/bin/python3
 
 import unittest
-from collections import defaultdict
 
 from cell import Cell
-from inference import InferenceRule
+from masks import MASK_POSITIONS, MASK_VALUES, values_to_mask
+from subsets import SubsetRule, find_hidden_subset
 
-class HiddenPairs(InferenceRule):
-    def evaluate(self):
-        """
-        http://sudokuessentials.com/sudoku_tips/
-        In the example at the left there is a hidden pair 2 and 9.
-        They are circled in red. Hidden pairs are identified by the fact that a pair of
-        numbers occur in only two cells of a row, column, or region.
-        They are “hidden” because the other numbers in the two cells make their presence harder to spot.
-
-        It is safe to remove all other digits from the two cells circled in red so that only the two and nine remain.
-        Hidden pairs will appear often in your Sudoku puzzles and games.See link above for example.
-        """
-        cell_changed = True  # run init at least once
-        while cell_changed:  # keep running when a change is made
-            cell_changed = False  # this ensures a change is made every loop
-
-            # check rows
-            for row in range(9):
-                cells = self.puzzle.get_row(row)
-                matches = self.evaluate_group(cells)
-                if self.execute_group(matches):
-                    self.move_count += 1
-                    cell_changed = True
-                    self.puzzle.is_board_valid()
-
-            # search cols
-            for col in range(9):
-                cells = self.puzzle.get_col(col)
-                matches = self.evaluate_group(cells)
-                if self.execute_group(matches):
-                    self.move_count += 1
-                    cell_changed = True
-                    self.puzzle.is_board_valid()
-
-            # search regions
-            for reg in range(9):
-                cells = self.puzzle.get_region(reg)
-                matches = self.evaluate_group(cells)
-                if self.execute_group(matches):
-                    self.move_count += 1
-                    cell_changed = True
-                    self.puzzle.is_board_valid()
 
+class HiddenPairs(SubsetRule):
+    """
+    http://sudokuessentials.com/sudoku_tips/
+    In the example at the left there is a hidden pair 2 and 9.
+    They are circled in red. Hidden pairs are identified by the fact that a pair of
+    numbers occur in only two cells of a row, column, or region.
+    They are “hidden” because the other numbers in the two cells make their presence harder to spot.
+
+    It is safe to remove all other digits from the two cells circled in red so that only the two and nine remain.
+    Hidden pairs will appear often in your Sudoku puzzles and games.See link above for example.
+
+    Runs the subset engine (see subsets.py) with size 2
+    """
+    name = 'hidden_pairs'
+    size = 2
+    hidden = True
 
     @staticmethod
-    def evaluate_group(cells):
+    def evaluate_group(cells, masks=None):
         """
         Given a list of cells, find hidden pairs
-        """
-
-        # maintain a dictionary of possible values
-        # key = value (1-9), value = list of cells where it could be
-        poss_values = defaultdict(list)
-        for cell in cells:
-            for val in cell.val:
-                poss_values[val].append(Cell(cell.row, cell.col, []))       # note the empty value, we only care about cell position
-
-        # if there are exactly two keys that are in the same two cells, those are a hidden pair
-        pairs = []
-        for val in poss_values:
-            if len(poss_values[val]) == 2:
-                pairs.append(val)
-
-        # there can only be two values for a pair
-        if len(pairs) != 2:
-            return []
-
-        # if the two values share the same two cells
-        # every other possible value in those two cells can be removed (this needs to be done by CALLER)
-        if poss_values[pairs[0]] == poss_values[pairs[1]]:
-            matches = []
-            for cell in poss_values[pairs[0]]:
-                matches.append(Cell(cell.row, cell.col, pairs))
-            return matches
+        Two values that can only go in the same two cells are a hidden pair, every other possible value
+        in those two cells can be removed (this needs to be done by CALLER)
+        Only a pair whose cells still have other values is returned
+        Return the two cells with the pair as their values, or [] if there is no such pair
 
-        # else no match
-        return []
-
-    def execute_group(self, matches):
-        """
-        Given 2 matching cells whose values contain a hidden pair, remove all other values from the paired cells
-        If the paired cells both already contain only the two numbers, return False (nothing was done)
+        masks are the candidate masks of the cells (see masks.py), they are built from the cells if not given
         """
-        if not matches:
-            return False
-
-        cell0 = matches[0]              # local var for readability (no extra brackets)
-        cell1 = matches[1]
-        if self.puzzle.board[cell0.row][cell0.col] == self.puzzle.board[cell1.row][cell1.col]:      # the cells already only contain the two numbers, nothing to do
-            return False
-
-        # debug print statements
-        # print(f'Matches {matches[0]} {matches[1]}')
-        # print(f'Values  {self.puzzle.board[cell0.row][cell0.col]} {self.puzzle.board[cell1.row][cell1.col]}')
-        # print(f'Board before')
-        # self.puzzle.print(simple=False)
-
-        # update the board
-        self.puzzle.board[cell0.row][cell0.col] = list(cell0.val)
-        self.puzzle.board[cell1.row][cell1.col] = list(cell1.val)
-
-        # print(f'After before')
-        # self.puzzle.print(simple=False)
-
-        return True                     # let caller know we took an action
+        if masks is None:
+            masks = [values_to_mask(cell.val) for cell in cells]
+        subset = find_hidden_subset(masks, 2)
+        if subset is None:
+            return []
+        return [Cell(cells[position].row, cells[position].col, list(MASK_VALUES[subset[1]]))
+                for position in MASK_POSITIONS[subset[0]]]
 
 
 class TestHiddenPairs(unittest.TestCase):
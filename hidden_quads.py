@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+import unittest
+
+from cell import Cell
+from masks import MASK_VALUES, values_to_mask
+from subsets import SubsetRule, find_hidden_subset, subset_changes
+
+
+class HiddenQuads(SubsetRule):
+    """
+    http://sudokuessentials.com/sudoku_tips/
+    Hidden quads are four numbers that can only go in the same four cells of a row, column, or region.
+    The other numbers in those four cells hide them, which makes them the hardest subsets to spot.
+
+    Every number other than the four can be removed from those four cells.
+
+    Runs the subset engine (see subsets.py) with size 4
+    """
+    name = 'hidden_quads'
+    size = 4
+    hidden = True
+
+    @staticmethod
+    def evaluate_group(cells, masks=None):
+        """
+        Given a list of cells, find a hidden quad: 4 values that can only go in the same 4 cells
+        Return the cells that change with their new values (the quad values they had), [] if there are none
+        """
+        if masks is None:
+            masks = [values_to_mask(cell.val) for cell in cells]
+        subset = find_hidden_subset(masks, 4)
+        if subset is None:
+            return []
+        return [Cell(cells[position].row, cells[position].col, list(MASK_VALUES[new_mask]))
+                for position, new_mask in subset_changes(masks, subset[0], subset[1], True)]
+
+
+class TestHiddenQuads(unittest.TestCase):
+    def test_evaluate_group(self):
+        cells = [
+            Cell(0, 0, [1, 2, 3, 4, 9]),    # hidden quad
+            Cell(0, 1, [5, 6, 7]),
+            Cell(0, 2, [1, 2, 5, 8]),       # hidden quad
+            Cell(0, 3, [3, 4, 6, 7]),       # hidden quad
+            Cell(0, 4, [5, 8, 9]),
+            Cell(0, 5, [1, 3, 6, 9]),       # hidden quad
+            Cell(0, 6, [5, 6, 7, 8, 9]),
+            Cell(0, 7, [7, 8, 9]),
+            Cell(0, 8, [5, 6, 8])
+        ]
+
+        # 1, 2, 3 and 4 only appear in the quad cells, the caller should remove every other value from them
+        expected = [
+            Cell(0, 0, [1, 2, 3, 4]),
+            Cell(0, 2, [1, 2]),
+            Cell(0, 3, [3, 4]),
+            Cell(0, 5, [1, 3])
+        ]
+
+        actual = HiddenQuads.evaluate_group(cells)
+        self.assertEqual(expected, actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
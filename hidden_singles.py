@@ -4,9 +4,40 @@ import unittest
 
 from cell import Cell
 from inference import InferenceRule
+from masks import POPCOUNT, SINGLE_POSITION, position_masks, values_to_mask
+from units import UNIT_COORDS
+
+
+def find_hidden_singles(masks):
+    """
+    Given the candidate masks of the cells in a unit, return the (position, value) of each value that can
+    only go in one unsolved cell, in position order
+    """
+    # for each value, the positions in the unit where it could be (see masks.position_masks)
+    positions = position_masks(masks)
+
+    hidden_singles = []
+    for value in range(1, 10):
+        position = SINGLE_POSITION[positions[value]]
+        if position is None or POPCOUNT[masks[position]] == 1:      # more than one place, none or already set
+            continue
+        hidden_singles.append((position, value))
+
+    hidden_singles.sort()
+    return hidden_singles
+
 
 class HiddenSingles(InferenceRule):
-    def evaluate(self):
+    name = 'hidden_singles'
+
+    def __init__(self, worklist=True):
+        """
+        If worklist is True (default) only the values the board queued when they were left in one place
+        of a unit are solved (see Sudoku.pop_hidden_single), otherwise every unit is rescanned until nothing changes
+        """
+        self.worklist = worklist
+
+    def evaluate(self, puzzle):
         """
         http://sudokuessentials.com/sudoku_tips/
         In the example at the left there are two hidden singles.
@@ -16,79 +47,74 @@ class HiddenSingles(InferenceRule):
         In this example, the third cell from the top is a seven.
         Likewise in the bottom cell the only number that can go there is a four
         See link above for example.
+        Return the number of cells solved
         """
+        if self.worklist:
+            return self.evaluate_queue(puzzle)
 
+        move_count = 0
         cell_changed = True  # run init at least once
         while cell_changed:  # keep running when a change is made
             cell_changed = False  # this ensures a change is made every loop
 
-            # check rows
-            for row in range(9):
-                cells = self.puzzle.get_row(row)
-                matches = self.evaluate_group(cells)
-                # print(f'Current puzzle, checking row {row}')
-                # self.puzzle.print(simple=False)
-                for match in matches:
-                    # print(f'Operating on match: {match}')
-                    self.puzzle.board[match.row][match.col] = [match.val]
-                    changed = self.puzzle.solve_cell(match)
-                    self.move_count += 1
+            # check rows, cols and regions (see units.py)
+            for unit in range(27):
+                if not puzzle.is_consistent():
+                    return move_count
+                moves = self.execute_group(puzzle, unit)
+                if moves:
+                    move_count += moves
                     cell_changed = True
-                    self.puzzle.is_board_valid()
-
-            # # check cols
-            for col in range(9):
-                cells = self.puzzle.get_col(col)
-                matches = self.evaluate_group(cells)
-                for match in matches:
-                    self.puzzle.board[match.row][match.col] = [match.val]
-                    changed = self.puzzle.solve_cell(match)
-                    self.move_count += 1
-                    cell_changed = True
-                    self.puzzle.is_board_valid()
-
-            # # check regions
-            for n in range(9):
-                cells = self.puzzle.get_region(n)
-                matches = self.evaluate_group(cells)
-                for match in matches:
-                    self.puzzle.board[match.row][match.col] = [match.val]
-                    changed = self.puzzle.solve_cell(match)
-                    self.move_count += 1
-                    cell_changed = True
-                    self.puzzle.is_board_valid()
+
+        return move_count
+
+    def execute_group(self, puzzle, unit):
+        """
+        Solve every hidden single in the given unit (see units.py), reading the candidate masks from the board
+        Return the number of cells solved
+        """
+        coords = UNIT_COORDS[unit]
+        moves = 0
+        for position, value in find_hidden_singles(list(puzzle.get_unit_masks(unit))):
+            row, col = coords[position]
+            puzzle.set_values(row, col, [value])
+            puzzle.solve_cell(Cell(row, col, value))
+            moves += 1
+        return moves
+
+    def evaluate_queue(self, puzzle):
+        """
+        Solve the hidden singles the board found as values were removed (see Sudoku.pop_hidden_single)
+        Solving a cell removes its value from the peers, which can leave other values in one place,
+        so this keeps going until the queue is empty
+        Return the number of cells solved
+        """
+        move_count = 0
+        found = puzzle.pop_hidden_single()
+        while found is not None and puzzle.is_consistent():
+            row, col, value = found
+            puzzle.set_values(row, col, [value])
+            puzzle.solve_cell(Cell(row, col, value))
+            move_count += 1
+            found = puzzle.pop_hidden_single()
+
+        return move_count
 
     @staticmethod
-    def evaluate_group(cells):
+    def evaluate_group(cells, masks=None):
         """
         Given a list of cells with multiple values, find a match
+        A value that can only go in one unsolved cell of the group is a hidden single
+        (values that are already set in a cell are ignored)
+        Return a Cell(row, col, value) for each hidden single in the order of the cells
+
+        masks are the candidate masks of the cells (see masks.py), they are built from the cells if not given
         """
-        # list each cell where a value is possible,
-        # if only one cell, that is a hidden single
-        # key = number (1-9), value = list of cells where it could be
-        poss_cells = {}
-        set_vals = []                   # values that are already set (ignore these as hidden singles)
-        for cell in cells:
-            # ignore cells with values set
-            if len(cell.val) == 1:
-                set_vals.append(cell.val[0])
-            else:
-                for val in cell.val:
-                    if val in poss_cells:
-                        poss_cells[val].append((cell.row, cell.col))
-                    else:
-                        poss_cells[val] = [(cell.row, cell.col)]
-
-        # if any values in poss_cells have a single value, that is a hidden single
-        hidden_singles = []
-        for value in poss_cells:
-            if value in set_vals:                       # if a value has already been set in a cell, ignore
-                continue
-            if len(poss_cells[value]) == 1:
-                row, col = poss_cells[value][0]
-                hidden_singles.append(Cell(row, col, value))
-
-        return hidden_singles
+        if masks is None:
+            masks = [values_to_mask(cell.val) for cell in cells]
+
+        return [Cell(cells[position].row, cells[position].col, value)
+                for position, value in find_hidden_singles(masks)]
 
 
 class TestHiddenSingles(unittest.TestCase):
@@ -134,6 +160,45 @@ class TestHiddenSingles(unittest.TestCase):
         actual_hidden = HiddenSingles.evaluate_group(cells)
         self.assertEqual(expected_hidden, actual_hidden)
 
+    def test_worklist_same_as_rescan(self):
+        """
+        The board's queue finds the same hidden singles as rescanning every unit
+        """
+        from naked_singles import NakedSingles
+        from propagation import propagate
+        from sudoku import Sudoku
+        puzzle_str = '''170 000 006
+                        006 090 040
+                        300 070 000
+                        000 900 030
+                        094 020 870
+                        030 005 000
+                        000 060 001
+                        080 010 500
+                        500 000 082'''
+        expected = Sudoku(puzzle_str)
+        propagate(expected, [NakedSingles, HiddenSingles(worklist=False)])
+        actual = Sudoku(puzzle_str)
+        propagate(actual, [NakedSingles, HiddenSingles()])
+
+        self.assertTrue(actual.is_board_solved())
+        self.assertEqual(expected.board, actual.board)
+
+    def test_queue(self):
+        """
+        Removing a value from all but one cell of a unit queues the hidden single right away,
+        removing it from the last cell is a contradiction
+        """
+        from sudoku import CONTRADICTION, Sudoku
+        sudoku = Sudoku()
+        for col in range(8):
+            sudoku.remove_value(0, col, 5)
+        self.assertEqual(1 << 8, sudoku.get_positions(0, 5))
+        self.assertEqual((0, 8, 5), sudoku.pop_hidden_single())
+        self.assertIsNone(sudoku.pop_hidden_single())
+
+        sudoku.remove_value(0, 8, 5)
+        self.assertEqual(CONTRADICTION, sudoku.status())
 
 
 if __name__ == '__main__':
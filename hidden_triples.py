@@ -1,189 +1,90 @@
 # !/usr/bin/python3
-import itertools
+import unittest
 from typing import List
 
 from cell import Cell
-from inference import InferenceRule
-import sudoku
+from masks import MASK_VALUES, values_to_mask
+from subsets import SubsetRule, find_hidden_subset, subset_changes
 
 
-def not_appear_other_cells(other_cells: List[Cell], poss_triple_vals: List[int]):
-    assert len(poss_triple_vals) == 3
-    for cell in other_cells:
-        for val in poss_triple_vals:
-            if val in cell.val:
-                return False
-    return True
+class HiddenTriples(SubsetRule):
+    """
+    http://sudokuessentials.com/sudoku_tips/
+    Hidden triples are much harder to spot. They will occur in harder puzzles.
+    Hidden triples like naked triples are restricted to three cells in a row, column, or region.
+    Hidden triples like hidden pairs have additional digits that camouflage the three candidates.
 
+    If you look at the example at the left, you will see three cells circled in red.
+    These are the hidden triples. Can you spot them?
 
-def appear_triple_cells(triple_cells: List[Cell], poss_triple_vals: List[int]):
-    assert len(poss_triple_vals) == 3
-    for cell in triple_cells:
-        has_at_least_one_val = any(val in cell.val for val in poss_triple_vals)
-        if not has_at_least_one_val:
-            return False
-    return True
+    You are right, they are 4, 8, and 9. Remove the extra numbers from the cells circled in red
+    Do you think hidden triples are tough to find? Try quads.
 
+    Runs the subset engine (see subsets.py) with size 3
+    """
+    name = 'hidden_triples'
+    size = 3
+    hidden = True
 
-def Diff(li1, li2):
-    return list(set(li1) - set(li2)) + list(set(li2) - set(li1))
-
-
-class HiddenTriples(InferenceRule):
-    def evaluate(self):
+    @staticmethod
+    def evaluate_group(cells: List[Cell], masks=None):
         """
-        http://sudokuessentials.com/sudoku_tips/
-        Hidden triples are much harder to spot. They will occur in harder puzzles.
-        Hidden triples like naked triples are restricted to three cells in a row, column, or region.
-        Hidden triples like hidden pairs have additional digits that camouflage the three candidates.
-
-        If you look at the example at the left, you will see three cells circled in red.
-        These are the hidden triples. Can you spot them?
+        Given a list of cells, find a hidden triple: 3 values that can only go in the same 3 cells
+        (each value in 2 or 3 of them), every other value can be removed from those cells
+        Return the cells that change with their new values (the triple values they had), [] if there are none
 
-        You are right, they are 4, 8, and 9. Remove the extra numbers from the cells circled in red
-        Do you think hidden triples are tough to find? Try quads.
-        """
-        # count = 0
-        # cell_changed = True  # run init at least once
-        # while cell_changed:  # keep running when a change is made
-        #     cell_changed = False  # this ensures a change is made every loop
-
-        # ROW
-        for row in range(9):
-            cells = self.puzzle.get_row(row)
-            self.execute_group(cells)
-            self.puzzle.is_board_valid()
-
-        # search cols
-        for col in range(9):
-            cells = self.puzzle.get_col(col)
-            self.execute_group(cells)
-            self.puzzle.is_board_valid()
-
-        # search regions
-        for reg in range(9):
-            cells = self.puzzle.get_region(reg)
-            self.execute_group(cells)
-            self.puzzle.is_board_valid()
-
-    def execute_triple(self, triple_cells: List[Cell], triple_vals: List[int]):
-        for cell in triple_cells:
-            new_val = sorted(list(set(cell.val) & set(triple_vals)))
-            self.puzzle.board[cell.row][cell.col] = new_val
-            cell.val = new_val
-
-    # @staticmethod
-    def execute_group(self, cells: List[Cell]):
-        """
-        Given a list of cells, find hidden pairs
+        masks are the candidate masks of the cells (see masks.py), they are built from the cells if not given
         """
-        poss_triple_cell_ids = itertools.combinations(range(len(cells)), 3)
-
-        for triple_cell_ids in poss_triple_cell_ids:
-            other_cell_ids = Diff(range(len(cells)), triple_cell_ids)
-            triple_cells = [cells[e] for e in triple_cell_ids]
-            other_cells = [cells[e] for e in other_cell_ids]
-
-            triple_vals = [cell.val for cell in triple_cells]
-            vals = set([val for val in itertools.chain.from_iterable(triple_vals)])
-            vals = list(vals)
-            if len(vals) < 3:
-                continue
-
-            poss_triple_vals = itertools.combinations(vals, 3)
-            for triple_vals in poss_triple_vals:
-                if not_appear_other_cells(other_cells, triple_vals) \
-                        and appear_triple_cells(triple_cells, triple_vals):
-                    self.execute_triple(triple_cells, triple_vals)
-                    # for cell in triple_cells:
-                    #     self.puzzle.board[cell.row][cell.col] = list(set(cell.val) & set(triple_vals))
-                    #     cell.val = list(set(cell.val) & set(triple_vals))
-        #
-        return cells
-
-
-# class TestHiddenTriples(unittest.TestCase):
-#     def test_evaluate_group(self):
-#         cells = [
-#             Cell(0, 0, [1, 2, 6]),
-#             Cell(0, 1, [1, 2, 5, 6]),
-#             Cell(0, 2, [4, 5, 8, 9]),  # hidden triple
-#             Cell(0, 3, [7]),
-#             Cell(0, 4, [1, 4, 6, 8]),  # hidden triple
-#             Cell(0, 5, [2, 3, 8, 9]),  # hidden triple
-#             Cell(0, 6, [2, 3, 5, 6]),
-#             Cell(0, 7, [2, 3, 6]),
-#             Cell(0, 8, [2, 3, 5])
-#         ]
-#
-#         expected = [
-#             Cell(0, 0, [1, 2, 6]),
-#             Cell(0, 1, [1, 2, 5, 6]),
-#             Cell(0, 2, [4, 8, 9]),
-#             Cell(0, 3, [7]),
-#             Cell(0, 4, [4, 8, 9]),
-#             Cell(0, 5, [4, 8, 9]),
-#             Cell(0, 6, [2, 3, 5, 6]),
-#             Cell(0, 7, [2, 3, 6]),
-#             Cell(0, 8, [2, 3, 5])
-#         ]
-#
-#         actual = HiddenTriples.execute_group(cells)
-#         self.assertEqual(expected, actual)
+        if masks is None:
+            masks = [values_to_mask(cell.val) for cell in cells]
+        subset = find_hidden_subset(masks, 3)
+        if subset is None:
+            return []
+        return [Cell(cells[position].row, cells[position].col, list(MASK_VALUES[new_mask]))
+                for position, new_mask in subset_changes(masks, subset[0], subset[1], True)]
+
+
+class TestHiddenTriples(unittest.TestCase):
+    def test_evaluate_group(self):
+        cells = [
+            Cell(0, 0, [1, 2, 6]),
+            Cell(0, 1, [1, 2, 5, 6]),
+            Cell(0, 2, [4, 5, 8, 9]),   # hidden triple
+            Cell(0, 3, [7]),
+            Cell(0, 4, [1, 4, 6, 8]),   # hidden triple
+            Cell(0, 5, [2, 3, 8, 9]),   # hidden triple
+            Cell(0, 6, [2, 3, 5, 6]),
+            Cell(0, 7, [2, 3, 6]),
+            Cell(0, 8, [2, 3, 5])
+        ]
+
+        # 4, 8 and 9 only appear in the triple cells, the caller should remove every other value from them
+        expected = [
+            Cell(0, 2, [4, 8, 9]),
+            Cell(0, 4, [4, 8]),
+            Cell(0, 5, [8, 9])
+        ]
+
+        actual = HiddenTriples.evaluate_group(cells)
+        self.assertEqual(expected, actual)
+
+        # once the other values are gone there is nothing left to do
+        for match in actual:
+            cells[match.col] = match
+        self.assertEqual([], HiddenTriples.evaluate_group(cells))
+
+    def test_execute_group(self):
+        from sudoku import Sudoku
+        sudoku = Sudoku()
+        for col, values in enumerate([[1, 2, 6], [1, 2, 5, 6], [4, 5, 8, 9], [7], [1, 4, 6, 8],
+                                      [2, 3, 8, 9], [2, 3, 5, 6], [2, 3, 6], [2, 3, 5]]):
+            sudoku.set_values(0, col, values)
+
+        rule = HiddenTriples()
+        self.assertTrue(rule.execute_group(sudoku, 0))
+        self.assertEqual([[4, 8, 9], [4, 8], [8, 9]], [sudoku.get_values(0, col) for col in [2, 4, 5]])
+        self.assertFalse(rule.execute_group(sudoku, 0))
 
 
 if __name__ == '__main__':
-    # unittest.main()
-    EVIL_SUDOKU = '''000 006 009
-    090 300 108
-    076 000 402
-    000 800 005
-    000 502 000
-    900 003 000
-    409 000 830
-    605 004 090
-    700 100 000
-    '''
-    cells = [
-        Cell(0, 0, [1, 2, 6]),
-        Cell(0, 1, [1, 2, 5, 6]),
-        Cell(0, 2, [4, 5, 8, 9]),  # hidden triple
-        Cell(0, 3, [7]),
-        Cell(0, 4, [1, 4, 6, 8]),  # hidden triple
-        Cell(0, 5, [2, 3, 8, 9]),  # hidden triple
-        Cell(0, 6, [2, 3, 5, 6]),
-        Cell(0, 7, [2, 3, 6]),
-        Cell(0, 8, [2, 3, 5])
-    ]
-
-    expected = [
-        Cell(0, 0, [1, 2, 6]),
-        Cell(0, 1, [1, 2, 5, 6]),
-        Cell(0, 2, [4, 8, 9]),
-        Cell(0, 3, [7]),
-        Cell(0, 4, [4, 8]),
-        Cell(0, 5, [8, 9]),
-        Cell(0, 6, [2, 3, 5, 6]),
-        Cell(0, 7, [2, 3, 6]),
-        Cell(0, 8, [2, 3, 5])
-    ]
-    expected_vals = [cell.val for cell in expected]
-
-    test_sudoku = sudoku.Sudoku(EVIL_SUDOKU)
-    test_sudoku.board[0][0] = [1, 2, 6]
-    test_sudoku.board[0][1] = [1, 2, 5, 6]
-    test_sudoku.board[0][2] = [4, 5, 8, 9]  # hidden triple
-    test_sudoku.board[0][3] = [7]
-    test_sudoku.board[0][4] = [1, 4, 6, 8]  # hidden triple
-    test_sudoku.board[0][5] = [2, 3, 8, 9]  # hidden triple
-    test_sudoku.board[0][6] = [2, 3, 5, 6]
-    test_sudoku.board[0][7] = [2, 3, 6]
-    test_sudoku.board[0][8] = [2, 3, 5]
-    # for i in range(1, 9):
-    #     for j in range(0, 9):
-    #         test_sudoku.board[i][j] = []
-
-    actor = HiddenTriples(puzzle=test_sudoku)
-    actor.execute_group(cells)
-    print(actor.puzzle.board[0])
-    # assert (actor.puzzle.board[0] == expected_vals)
+    unittest.main()
@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 
+import time
 from abc import ABC, abstractmethod
 # import sudoku.Sudoku
 
@@ -10,21 +11,41 @@ class InferenceRule(ABC):
     """
     Generic parent class for sudoku inference rules
 
+    A rule only holds its settings, the board is passed to every call (rule = NakedPairs(); rule.apply(sudoku)),
+    so one rule object can be used on any number of boards, forks and threads at once.
+    Anything a rule keeps per board is kept on the board (see Sudoku.is_unit_dirty) and its counters
+    go to SolveStats (see apply)
     """
-    # from sudoku import Sudoku
-    def __init__(self, puzzle):
-        self.puzzle = puzzle
-        self.move_count = 0
-        self.max_count = 30
+    name = 'rule'                               # key for the rule's counters in SolveStats
+
+    def apply(self, puzzle, stats=None):
+        """
+        Run the rule on the given board and return the number of possible values it eliminated
+        Nothing is done on a board that already has a contradiction (see Sudoku.status), the caller
+        should check the board's status after applying a rule
+        If a SolveStats object is given, the rule's moves, eliminations and time are added to it
+        """
+        moves = 0
+        elimination_count = puzzle.elimination_count
+        start = time.perf_counter()
+        try:
+            if puzzle.is_consistent():
+                moves = self.evaluate(puzzle)
+        finally:
+            eliminations = puzzle.elimination_count - elimination_count
+            if stats is not None:
+                stats.record_rule(self.name, moves, eliminations, time.perf_counter() - start)
+        return eliminations
 
     @abstractmethod
-    def evaluate(self):
+    def evaluate(self, puzzle):
         """
-        Find the first cell whose value can be inferred
+        Find the cells of the given board whose value can be inferred
         If found:
             update inferred cell with value
             remove inferred value from possible values in row, col and subgroup
 
-        NOTE: Make sure to update self.move_count every time a cell is updated
+        Return the number of moves made (what a move is depends on the rule)
+        Rules should stop as soon as the board is no longer consistent (see Sudoku.is_consistent)
         """
         pass
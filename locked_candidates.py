@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+import unittest
+
+from inference import InferenceRule
+from masks import POPCOUNT
+from units import COLS, COORDS, REGION_OF, REGIONS, ROWS
+
+# positions (see Sudoku.get_positions) in each third of a unit: for a row or col these are the cells
+# in each of the 3 regions it crosses, for a region they are the cells on each of its 3 rows
+THIRD_MASKS = (0b000000111, 0b000111000, 0b111000000)
+# positions on each of the 3 cols of a region
+REGION_COL_MASKS = (0b001001001, 0b010010010, 0b100100100)
+
+# [region][line] -> (row, col) of the cells on the line through the region that are outside the region
+# lines 0-2 are the region's rows (top to bottom), lines 3-5 its cols (left to right)
+POINTING_TARGETS = tuple(
+    tuple(tuple(COORDS[index] for index in ROWS[region // 3 * 3 + line] if REGION_OF[index] != region)
+          for line in range(3)) +
+    tuple(tuple(COORDS[index] for index in COLS[region % 3 * 3 + line] if REGION_OF[index] != region)
+          for line in range(3))
+    for region in range(9))
+
+# [unit][third] for the row and col units (0-17) -> (row, col) of the cells in the third region the line crosses
+# that are not on the line
+CLAIMING_TARGETS = tuple(
+    tuple(tuple(COORDS[index] for index in REGIONS[REGION_OF[line_cells[third * 3]]] if index not in line_cells)
+          for third in range(3))
+    for line_cells in ROWS + COLS)
+
+
+class LockedCandidates(InferenceRule):
+    name = 'locked_candidates'
+
+    def evaluate(self, puzzle):
+        """
+        http://sudokuessentials.com/sudoku_tips/
+        Pointing: when a number can only go on one row (or column) inside a region, it has to be
+        placed in that region, so it can be removed from the rest of that row (or column).
+
+        Claiming (box-line reduction) is the reverse: when a number can only go in one region
+        along a row (or column), it can be removed from the other cells of that region.
+
+        Uses the positions the board keeps for each value of each unit (see Sudoku.get_positions)
+        Return the number of moves, one for every unit and value that changed the board
+        """
+        move_count = 0
+        cell_changed = True  # run init at least once
+        while cell_changed:  # keep running when a change is made
+            cell_changed = False  # this ensures a change is made every loop
+
+            # check rows, cols and regions (see units.py), skipping units that did not change since the last pass
+            for unit in range(27):
+                if not puzzle.is_consistent():
+                    return move_count
+                if not puzzle.is_unit_dirty(self, unit):
+                    continue
+                for value in range(1, 10):
+                    if self.execute_group(puzzle, unit, value):
+                        move_count += 1
+                        cell_changed = True
+
+        return move_count
+
+    def execute_group(self, puzzle, unit, value):
+        """
+        If value is locked into one third of the unit, remove it from the cells the lock rules out
+        Return True if a value was removed, else False
+        """
+        positions = puzzle.get_positions(unit, value)
+        if POPCOUNT[positions] < 2:             # solved or a single place (singles rules handle those)
+            return False
+
+        targets = None
+        if unit >= 18:
+            # pointing: the value is on one row or col of the region
+            region = unit - 18
+            for line in range(3):
+                if not positions & ~THIRD_MASKS[line]:
+                    targets = POINTING_TARGETS[region][line]
+                elif not positions & ~REGION_COL_MASKS[line]:
+                    targets = POINTING_TARGETS[region][3 + line]
+        else:
+            # claiming: the value is in one region along the row or col
+            for third in range(3):
+                if not positions & ~THIRD_MASKS[third]:
+                    targets = CLAIMING_TARGETS[unit][third]
+
+        if targets is None:
+            return False
+
+        value_removed = False
+        for row, col in targets:
+            if puzzle.remove_value(row, col, value):
+                value_removed = True
+        return value_removed
+
+
+class TestLockedCandidates(unittest.TestCase):
+    def test_targets(self):
+        # the middle row of the center region points at the rest of row 4
+        self.assertEqual(((4, 0), (4, 1), (4, 2), (4, 6), (4, 7), (4, 8)), POINTING_TARGETS[4][1])
+        # row 0 in the top right region claims the rest of that region
+        self.assertEqual(((1, 6), (1, 7), (1, 8), (2, 6), (2, 7), (2, 8)), CLAIMING_TARGETS[0][2])
+        # col 1 in the top left region claims the rest of that region
+        self.assertEqual(((0, 0), (0, 2), (1, 0), (1, 2), (2, 0), (2, 2)), CLAIMING_TARGETS[10][0])
+
+    def test_pointing(self):
+        """
+        5 can only go on row 0 of the upper left region, so it is removed from the rest of row 0
+        """
+        from sudoku import Sudoku
+        sudoku = Sudoku()
+        for row in [1, 2]:
+            for col in range(3):
+                sudoku.remove_value(row, col, 5)
+
+        rule = LockedCandidates()
+        self.assertTrue(rule.execute_group(sudoku, 18, 5))
+        self.assertEqual([col < 3 for col in range(9)], [5 in sudoku.get_values(0, col) for col in range(9)])
+        self.assertFalse(rule.execute_group(sudoku, 18, 5))
+
+    def test_claiming(self):
+        """
+        7 can only go in the right region along row 4, so it is removed from the rest of that region
+        """
+        from sudoku import Sudoku
+        sudoku = Sudoku()
+        for col in range(6):
+            sudoku.remove_value(4, col, 7)
+
+        LockedCandidates().apply(sudoku)
+        for row in range(3, 6):
+            self.assertEqual([row == 4] * 3, [7 in sudoku.get_values(row, col) for col in range(6, 9)])
+        self.assertTrue(sudoku.is_consistent())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,7 +10,7 @@ import unittest
 from cell import Cell
 from hidden_singles import HiddenSingles
 from naked_singles import NakedSingles
-from sudoku import Sudoku
+from sudoku import CHECK_FULL, CHECK_OFF, CONTRADICTION, OK, Sudoku
 
 puzzle_1_easy = '''240 300 000  
                 000 520 407
@@ -154,6 +154,106 @@ Solved cells: 33 (41%)
         # 2 should now be missing from possible values
         self.assertEqual(sudoku.board[6][7], [1, 2, 3, 4, 5, 6, 7, 8])
 
+    def test_check_mode(self):
+        """
+        Contradictions are reported by status() when a cell runs out of values or repeats a solved peer,
+        only a mismatch between the counters and the board raises (CHECK_FULL)
+        """
+        for check_mode in [CHECK_OFF, CHECK_FULL]:
+            sudoku = Sudoku(puzzle_1_easy, check_mode=check_mode)
+            self.assertEqual(OK, sudoku.status())
+            sudoku.set_values(0, 2, [2])                # 2 is already at 0,0
+            self.assertEqual(CONTRADICTION, sudoku.status())
+            self.assertFalse(sudoku.is_board_valid())
+            self.assertFalse(sudoku.is_group_valid(sudoku.get_values(0, col) for col in range(9)))
+            sudoku = Sudoku(puzzle_1_easy, check_mode=check_mode)
+            sudoku.set_values(0, 2, [])
+            self.assertEqual(CONTRADICTION, sudoku.status())
+
+        sudoku = Sudoku(puzzle_1_easy, check_mode=CHECK_FULL)
+        sudoku.solved_count += 1                        # simulate a bookkeeping bug
+        with self.assertRaises(Exception):
+            sudoku.set_values(0, 2, [1, 5])
+
+    def test_counters(self):
+        """
+        Solved cell count and unit checks are kept up to date as cells change
+        """
+        sudoku = Sudoku(puzzle_1_easy, check_mode=CHECK_OFF)
+        start_count = sudoku.get_solved_cell_count()
+        self.assertTrue(sudoku.is_unit_valid(0))
+
+        sudoku.set_values(0, 2, [4])                    # 4 is already at 0,1 (row 0 and region 0)
+        self.assertEqual(start_count + 1, sudoku.get_solved_cell_count())
+        self.assertFalse(sudoku.is_unit_valid(0))
+        self.assertFalse(sudoku.is_unit_valid(18))
+        self.assertTrue(sudoku.is_unit_valid(9 + 2))
+        self.assertFalse(sudoku.is_consistent())
+
+        sudoku.set_values(0, 2, [1, 5])
+        self.assertEqual(start_count, sudoku.get_solved_cell_count())
+        self.assertTrue(sudoku.is_consistent())
+
+    def test_undo(self):
+        """
+        Changes made after a mark are rolled back by undo, including the counters
+        """
+        sudoku = Sudoku(puzzle_1_easy)
+        expected = sudoku.print(simple=False)
+        start_count = sudoku.get_solved_cell_count()
+
+        mark = sudoku.mark()
+        sudoku.set_values(0, 2, [1])
+        sudoku.solve_cell(Cell(0, 2, 1))
+        self.assertNotEqual(expected, sudoku.print(simple=False))
+
+        sudoku.undo(mark)
+        self.assertEqual(expected, sudoku.print(simple=False))
+        self.assertEqual(start_count, sudoku.get_solved_cell_count())
+
+    def test_fork(self):
+        """
+        A fork shares rows with the original board until either board changes them
+        """
+        sudoku = Sudoku(puzzle_1_easy)
+        expected = sudoku.print(simple=False)
+        fork = sudoku.fork()
+        self.assertIs(sudoku.board[0], fork.board[0])
+
+        fork.set_values(0, 2, [1])
+        fork.solve_cell(Cell(0, 2, 1))
+        self.assertEqual(expected, sudoku.print(simple=False))
+        self.assertIs(sudoku.board[8], fork.board[8])       # row 8 has no cells changed by 0,2 = 1
+        self.assertEqual(sudoku.get_solved_cell_count() + 1, fork.get_solved_cell_count())
+
+        sudoku.remove_value(1, 0, 9)
+        self.assertEqual([8], sudoku.get_values(1, 0))
+        self.assertEqual([8, 9], fork.get_values(1, 0))
+
+    def test_most_constrained_cell(self):
+        """
+        The cell with the fewest values comes first, ties go to the cell with the most unsolved peers,
+        and undo puts the buckets back
+        """
+        sudoku = Sudoku()
+        self.assertEqual((0, 0), sudoku.most_constrained_cell())
+        sudoku.set_values(4, 4, [1, 2, 3])
+        sudoku.set_values(8, 8, [1, 2, 3])
+        sudoku.set_values(8, 0, [5])            # 8,8 now has one less unsolved peer than 4,4
+        self.assertEqual((4, 4), sudoku.most_constrained_cell())
+
+        mark = sudoku.mark()
+        sudoku.set_values(8, 8, [1, 2])
+        self.assertEqual((8, 8), sudoku.most_constrained_cell())
+        sudoku.undo(mark)
+        self.assertEqual((4, 4), sudoku.most_constrained_cell())
+        self.assertTrue(sudoku.verify_counters())
+
+        for row, col in [(4, 4), (8, 8)]:
+            sudoku.set_values(row, col, [9])
+        self.assertTrue(sudoku.verify_counters())
+        self.assertEqual(81 - 3, sum(bin(cells).count('1') for cells in sudoku.size_cells))
+
     def test_naked_singles(self):
         """
         Test naked singles on easy puzzle
@@ -202,6 +302,16 @@ Solved cells: 33 (41%)
         actual = sudoku.get_bt_puzzle()
         self.assertEqual(expected, actual)
 
+    def test_fixed_baseline_backtrack(self):
+        """
+        The fixed baseline stops at the first solution and leaves it in bt_puzzle
+        """
+        sudoku = Sudoku(puzzle_3_hard)
+        self.assertEqual(1, sudoku.solve_fixed_baseline_backtrack_entry(max_solutions=2))
+        solved = Sudoku(''.join(str(value) for row in sudoku.bt_puzzle for value in row))
+        self.assertTrue(solved.is_board_solved())
+        self.assertGreater(sudoku.bt_count, 0)
+
 if __name__ == '__main__':
     unittest.main()
 
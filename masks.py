@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+"""
+Helpers for the 9-bit candidate masks used by the bitboard backend
+
+Bit (value - 1) is set when value is still possible for a cell, so:
+    [1, 2, 3, 4, 5, 6, 7, 8, 9] -> 0b111111111 (ALL_VALUES)
+    [4, 6]                      -> 0b000101000
+    [9]                         -> 0b100000000
+"""
+from typing import List
+
+ALL_VALUES = 0x1FF                                          # all nine values possible
+
+VALUE_BITS = [0] + [1 << (value - 1) for value in range(1, 10)]   # VALUE_BITS[value] -> bit for that value
+
+# lookup tables for every possible mask (2^9 entries), built once at import
+MASK_VALUES = tuple(tuple(value for value in range(1, 10) if mask & VALUE_BITS[value]) for mask in range(512))
+POPCOUNT = tuple(len(values) for values in MASK_VALUES)
+
+# for masks with exactly one bit set, the value of that bit (0 otherwise)
+SINGLE_VALUE = tuple(values[0] if len(values) == 1 else 0 for values in MASK_VALUES)
+
+# the same masks read as positions 0-8 in a unit (see position_masks), MASK_POSITIONS[mask] -> positions of the set bits
+MASK_POSITIONS = tuple(tuple(value - 1 for value in values) for values in MASK_VALUES)
+SINGLE_POSITION = tuple(positions[0] if len(positions) == 1 else None for positions in MASK_POSITIONS)   # None unless one bit set
+
+
+def values_to_mask(values) -> int:
+    """
+    Convert a list of possible values (i.e. [4, 6]) into a candidate mask
+    """
+    mask = 0
+    for value in values:
+        mask |= VALUE_BITS[value]
+    return mask
+
+
+def mask_to_values(mask: int) -> List[int]:
+    """
+    Convert a candidate mask into a (new) sorted list of possible values
+    """
+    return list(MASK_VALUES[mask])
+
+
+def position_masks(masks) -> List[int]:
+    """
+    Given the candidate masks of the 9 cells in a unit, return the dual masks by value:
+    [value] is a 9-bit mask of the positions (0-8) in the unit where value is still possible
+    (index 0 is unused so values index it directly)
+    """
+    positions = [0] * 10
+    for position, mask in enumerate(masks):
+        bit = 1 << position
+        for value in MASK_VALUES[mask]:
+            positions[value] |= bit
+    return positions
@@ -1,9 +1,6 @@
-import copy
 import math
 from typing import List
 
-import utility
-from cell import Cell
 from hidden_pairs import HiddenPairs
 from hidden_singles import HiddenSingles
 from hidden_triples import HiddenTriples
@@ -11,18 +8,30 @@ from inference import InferenceRule
 from naked_pairs import NakedPairs
 from naked_singles import NakedSingles
 from naked_triples import NakedTriples
+from masks import MASK_VALUES
 from sudoku import Sudoku
+from units import PEER_COORDS
+from utility import Budget, CancelToken, SolveStats
 
+# value orderings for the backtracking solvers (see order_values)
+ASCENDING = 'ascending'                 # 1 to 9
+LEAST_CONSTRAINING = 'lcv'              # values that rule out the fewest peer values first
 
-def get_sorted_constrained_vars(sudoku: Sudoku):
-    # res = PriorityQueue()
-    res = []
-    for i in range(9):
-        for j in range(9):
-            if len(sudoku.board[i][j]) > 1:
-                res.append((len(sudoku.board[i][j]), (i, j)))
-    res.sort()
-    return res
+
+def order_values(sudoku: Sudoku, row, col, value_order=ASCENDING):
+    """
+    Return the possible values of the cell at row,col in the order a search should try them
+    LEAST_CONSTRAINING counts, for each value, the peers that still have it (those lose a value if it is
+    placed here) and tries the lowest count first, ties stay in ascending order
+    """
+    values = list(MASK_VALUES[sudoku.get_mask(row, col)])
+    if value_order == LEAST_CONSTRAINING and len(values) > 1:
+        counts = [0] * 10
+        for peer_row, peer_col in PEER_COORDS[row * 9 + col]:
+            for value in MASK_VALUES[sudoku.get_mask(peer_row, peer_col)]:
+                counts[value] += 1
+        values.sort(key=lambda value: counts[value])
+    return values
 
 
 def is_final_cell(board_vals: List[int]):
@@ -69,86 +78,20 @@ def solve_fixed_baseline_backtrack(self, start_row=0, start_col=0, count=0):
 
 
 
-def solve_most_constrained_var(sudoku: Sudoku, rules: List[InferenceRule] = []):
+def solve_most_constrained_var(sudoku: Sudoku, rules: List[InferenceRule] = [], stats: SolveStats = None,
+                               value_order=ASCENDING, max_nodes=None, deadline=None, cancel: CancelToken = None):
     """
     Most Constrained Variable: Pick a slot that has the least number of values in its domain.
+    Return the solved board or -1 if there is no solution
+    Pass a SolveStats object to collect the node/backtrack/rule counters and time
+    max_nodes, deadline and cancel limit the search (see utility.Budget), the board is left part way solved
+    value_order is ASCENDING or LEAST_CONSTRAINING (see order_values)
+    The search itself is search.Search with MOST_CONSTRAINED cell selection (the board keeps its unsolved
+    cells bucketed by domain size, ties go to the most unsolved peers)
     """
-    # if sudoku.is_board_solved():
-    #     return sudoku
-    utility.counter += 1
-    for rule in rules:
-        if isinstance(rule, InferenceRule):
-            rule_obj = rule
-        else:
-            rule_obj = rule(sudoku)
-
-        # if isinstance(rule_obj, NakedSingles):
-        #     utility.rule_tracker.naked_singles += 1
-        # elif isinstance(rule_obj, HiddenSingles):
-        #     utility.rule_tracker.hidden_singles += 1
-        # elif isinstance(rule_obj, NakedPairs):
-        #     utility.rule_tracker.naked_pairs += 1
-        # elif isinstance(rule_obj, HiddenPairs):
-        #     utility.rule_tracker.hidden_pairs += 1
-        # elif isinstance(rule_obj, NakedTriples):
-        #     utility.rule_tracker.naked_triples += 1
-        # elif isinstance(rule_obj, HiddenTriples):
-        #     utility.rule_tracker.hidden_triples += 1
-
-        try:
-            rule_obj.evaluate()
-        except Exception as e:
-            return -1
-        # rule_obj.evaluate()
-
-        if isinstance(rule_obj, NakedSingles):
-            utility.rule_tracker.naked_singles += rule_obj.move_count
-        elif isinstance(rule_obj, HiddenSingles):
-            utility.rule_tracker.hidden_singles += rule_obj.move_count
-        elif isinstance(rule_obj, NakedPairs):
-            utility.rule_tracker.naked_pairs += rule_obj.move_count
-        elif isinstance(rule_obj, HiddenPairs):
-            utility.rule_tracker.hidden_pairs += rule_obj.move_count
-        elif isinstance(rule_obj, NakedTriples):
-            utility.rule_tracker.naked_triples += rule_obj.move_count
-        elif isinstance(rule_obj, HiddenTriples):
-            utility.rule_tracker.hidden_triples += rule_obj.move_count
-
-        sudoku = rule_obj.puzzle
-        if sudoku.is_board_solved():
-            return sudoku
-
-    queue_cells = get_sorted_constrained_vars(sudoku)
-    if len(queue_cells) == 0:
-        # print('solved')
-        # sudoku.print()
-        return sudoku
-
-    for q_item in queue_cells:
-        i, j = q_item[1]
-        possible_values = sudoku.board[i][j]
-
-        for val in possible_values:
-            if is_valid_cell_value(val, sudoku.board, i, j):
-                # print(f'BT {i}, {j}, val = {val}')
-                new_sudoku = copy.deepcopy(sudoku)
-                new_sudoku.board[i][j] = [val]
-                # update val of all other cells
-                try:
-                    new_sudoku.solve_cell(Cell(i, j, val))
-                except Exception as e:
-                    # print('Error = ', e)
-                    continue
-
-                possible_sudoku = solve_most_constrained_var(new_sudoku, rules)
-                if possible_sudoku != -1:
-                    return possible_sudoku
-
-        # print(f'out of values for {i}, {j}')
-        return -1
-
-    return -1
-    # return sudoku
+    from search import MOST_CONSTRAINED, Search
+    return Search(sudoku, rules, MOST_CONSTRAINED, value_order=value_order, stats=stats,
+                  budget=Budget(max_nodes, deadline, cancel)).run()
 
 
 EVIL_SUDOKU = '''000 006 009
@@ -169,18 +112,25 @@ def test_most_constrained_func():
     # rules = [NakedSingles(sudoku), HiddenSingles(sudoku)]
     rules = [HiddenTriples]
     # rules = []
-    utility.counter = 0
-    utility.rule_tracker.reset()
-    solved_sudoku = solve_most_constrained_var(sudoku, rules)
+    stats = SolveStats()
+    solved_sudoku = solve_most_constrained_var(sudoku, rules, stats)
     # assert solved_sudoku.is_board_solved()
     if solved_sudoku != -1:
         solved_sudoku.print()
-        print(utility.counter)
-        print(utility.rule_tracker)
+        print(stats)
     else:
         print('error')
 
 
+def test_order_values():
+    sudoku = Sudoku(EVIL_SUDOKU)
+    # 0,0 can be 1, 2, 3, 5 or 8, 8 is still possible in the fewest peers and 2 in the most
+    assert order_values(sudoku, 0, 0) == [1, 2, 3, 5, 8]
+    assert order_values(sudoku, 0, 0, LEAST_CONSTRAINING) == [8, 1, 3, 5, 2]
+    for value_order in [ASCENDING, LEAST_CONSTRAINING]:
+        assert solve_most_constrained_var(Sudoku(EVIL_SUDOKU), value_order=value_order).is_board_solved()
+
+
 def test_most_constrained_self():
     sudoku = Sudoku(EVIL_SUDOKU)
     # print(sudoku.solve_most_constrained_var())
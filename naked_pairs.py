@@ -1,122 +1,46 @@
 #!/usr/bin/python3
 
 import unittest
-from collections import defaultdict
 
 from cell import Cell
-from inference import InferenceRule
+from masks import MASK_POSITIONS, values_to_mask
+from subsets import SubsetRule, find_naked_subset
 
-class NakedPairs(InferenceRule):
-    def evaluate(self):
-        """
-        http://sudokuessentials.com/sudoku_tips/
-        In the example to the left there is a “naked pair”.
-        A naked pair is two identical candidates in a particular row, column, or region.
-        This combination of candidates will occur often also.
 
-        When you see a naked pair, it is safe to eliminate those two numbers from all other cells
-        in the row, column, or region the pair reside in.
+class NakedPairs(SubsetRule):
+    """
+    http://sudokuessentials.com/sudoku_tips/
+    In the example to the left there is a “naked pair”.
+    A naked pair is two identical candidates in a particular row, column, or region.
+    This combination of candidates will occur often also.
 
-        In the naked pair example, it is safe to eliminate the four and six from the two quads of 3,4,6, and 8.
-        Doing so, leaves two 3,8 pairs. The 3,4,6, and 8 quads are really “hidden pairs”. More Sudoku tips on this.
-        See link above for example.
-        """
-        cell_changed = True  # run init at least once
-        while cell_changed:  # keep running when a change is made
-            cell_changed = False  # this ensures a change is made every loop
-
-            # check rows
-            for row in range(9):
-                cells = self.puzzle.get_row(row)
-                matches = self.evaluate_group(cells)
-                if self.execute_group(matches, cells):
-                    self.move_count += 1
-                    cell_changed = True
-                    self.puzzle.is_board_valid()
-
-            # check cols
-            for col in range(9):
-                cells = self.puzzle.get_col(col)
-                matches = self.evaluate_group(cells)
-                if self.execute_group(matches, cells):
-                    self.move_count += 1
-                    cell_changed = True
-                    self.puzzle.is_board_valid()
-
-            # check regions
-            for reg in range(9):
-                cells = self.puzzle.get_region(reg)
-                matches = self.evaluate_group(cells)
-                if self.execute_group(matches, cells):
-                    self.move_count += 1
-                    cell_changed = True
-                    self.puzzle.is_board_valid()
+    When you see a naked pair, it is safe to eliminate those two numbers from all other cells
+    in the row, column, or region the pair reside in.
+
+    In the naked pair example, it is safe to eliminate the four and six from the two quads of 3,4,6, and 8.
+    Doing so, leaves two 3,8 pairs. The 3,4,6, and 8 quads are really “hidden pairs”. More Sudoku tips on this.
+    See link above for example.
 
+    Runs the subset engine (see subsets.py) with size 2
+    """
+    name = 'naked_pairs'
+    size = 2
+    hidden = False
 
     @staticmethod
-    def evaluate_group(cells):
+    def evaluate_group(cells, masks=None):
         """
-        Given a list of cells, find naked pairs
+        Given a list of cells, find a naked pair: two cells with the same two possible values
+        Only a pair that can remove a value from another cell in the group is returned
+        Return the two cells, or [] if there is no such pair
         """
-        # for cells that have exactly 2 values, concat the values into a string
-        # use that string as a key to a dictionary, using a list of positions (row,col) as the values
-        # once all cells have been checked, if any value in the dict has exactly 2 items that means it is a naked pair
-        matches = []
-        paired_cells = defaultdict(list)
-
-        for cell in cells:
-            values = cell.val
-            if len(values) != 2:            # ignore every cell that does NOT have 2 possible values (hence pairs)
-                continue
-
-            key = str(values)
-            paired_cells[key].append(Cell(cell.row, cell.col, values))
+        if masks is None:
+            masks = [values_to_mask(cell.val) for cell in cells]
+        subset = find_naked_subset(masks, 2)
+        if subset is None:
+            return []
+        return [cells[position] for position in MASK_POSITIONS[subset[0]]]
 
-        # now that we've checked all cells, see if there's a pair of values in two different cells
-        for cell in paired_cells:
-            if len(paired_cells[cell]) != 2:              # only look for paired cells
-                continue
-
-            for match in paired_cells[cell]:
-                matches.append(match)
-
-        return matches
-
-    def execute_group(self, matches, cells):
-        """
-        Given 2 matching cells whose values contain a naked pair, remove that pair of numbers from possible values
-        for all other cells in the group
-        Return True if any cells are updated, else false
-        """
-        if not matches:
-            return False
-
-        # the matches var is a list of cells. we want the possible values of those cells (same in both cells)
-        # so take the first cell and the 0th and 1th value
-        paired_value_0 = matches[0].val[0]      # in unit test below, this would be '4'
-        paired_value_1 = matches[0].val[1]      # in unit test below, this would be '6'
-
-        value_removed = False                   # tracks whether or not this routine did anything
-
-        for cell in cells:
-            if len(cell.val) == 1:              # ignore cells with values already set
-                continue
-
-            # ignore the cells that contain the paired values
-            if cell.row == matches[0].row and cell.col == matches[0].col:       # first paired cell
-                continue
-            if cell.row == matches[1].row and cell.col == matches[1].col:       # second paired cell
-                continue
-
-            # otherwise, look for the 2 paired values in all other cells. remove if found
-            if paired_value_0 in cell.val:
-                self.puzzle.board[cell.row][cell.col].remove(paired_value_0)    # first paired value
-                value_removed = True
-            if paired_value_1 in cell.val:
-                self.puzzle.board[cell.row][cell.col].remove(paired_value_1)    # second paired value
-                value_removed = True
-
-        return value_removed
 
 class TestNakePairs(unittest.TestCase):
     def test_evaluate_group(self):
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+import unittest
+
+from cell import Cell
+from masks import MASK_POSITIONS, MASK_VALUES, values_to_mask
+from subsets import SubsetRule, find_naked_subset
+
+
+class NakedQuads(SubsetRule):
+    """
+    http://sudokuessentials.com/sudoku_tips/
+    Naked quads are four cells in a row, column, or region that only have four numbers between them.
+    Like naked triples, each cell does not need all four numbers.
+
+    Those four numbers can only go in those four cells, so they can be removed from every other
+    cell in the row, column, or region.
+
+    Runs the subset engine (see subsets.py) with size 4
+    """
+    name = 'naked_quads'
+    size = 4
+    hidden = False
+
+    @staticmethod
+    def evaluate_group(cells, masks=None):
+        """
+        Given a list of cells, find a naked quad: 4 unsolved cells whose possible values together
+        are only 4 values
+        Only a quad that can remove a value from another cell in the group is returned
+        Return the 4 cells and the set of 4 values, or [], set() if there is no such quad
+        """
+        if masks is None:
+            masks = [values_to_mask(cell.val) for cell in cells]
+        subset = find_naked_subset(masks, 4)
+        if subset is None:
+            return [], set()
+        return [cells[position] for position in MASK_POSITIONS[subset[0]]], set(MASK_VALUES[subset[1]])
+
+
+class TestNakedQuads(unittest.TestCase):
+    def test_evaluate_group(self):
+        cells = [
+            Cell(0, 0, [1, 5]),             # naked quad
+            Cell(0, 1, [1, 2, 5, 9]),
+            Cell(0, 2, [1, 4, 6]),
+            Cell(0, 3, [5, 6]),             # naked quad
+            Cell(0, 4, [3]),
+            Cell(0, 5, [1, 2, 6, 7, 8]),
+            Cell(0, 6, [1, 6, 8]),          # naked quad
+            Cell(0, 7, [5, 8]),             # naked quad
+            Cell(0, 8, [2, 4, 7, 9])
+        ]
+
+        expected_cells = [cells[0], cells[3], cells[6], cells[7]]
+
+        actual_cells, actual_quad = NakedQuads.evaluate_group(cells)
+        self.assertEqual(expected_cells, actual_cells)
+        self.assertEqual({1, 5, 6, 8}, actual_quad)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,10 +3,20 @@ import unittest
 
 from cell import Cell
 from inference import InferenceRule
+from masks import SINGLE_VALUE
 
 
 class NakedSingles(InferenceRule):
-    def evaluate(self):
+    name = 'naked_singles'
+
+    def __init__(self, worklist=True):
+        """
+        If worklist is True (default) only cells the board queued when they were reduced to a single value
+        are propagated, otherwise every cell is rescanned until nothing changes
+        """
+        self.worklist = worklist
+
+    def evaluate(self, puzzle):
         """
         http://sudokuessentials.com/sudoku_tips/
         Every Sudoku puzzle will have cells that have only one possible candidate.
@@ -17,19 +27,70 @@ class NakedSingles(InferenceRule):
         The logic is simple. If there is one cell that contains a single candidate,
         then that candidate is the solution for that cell.
         See link above for example.
+        Return the number of cells solved
         """
+        if self.worklist:
+            return self.evaluate_queue(puzzle)
 
+        move_count = 0
         cell_changed = True  # run init at least once
-        while cell_changed:  # keep running when a change is made
+        while cell_changed and puzzle.is_consistent():  # keep running when a change is made
             cell_changed = False  # this ensures a change is made every loop
             for row in range(9):
                 for col in range(9):
-                    value = self.puzzle.board[row][col]
-                    if len(value) == 1:
-                        cell = Cell(row, col, value[0])
-                        changed = self.puzzle.solve_cell(cell)
+                    value = SINGLE_VALUE[puzzle.get_mask(row, col)]
+                    if value:
+                        cell = Cell(row, col, value)
+                        changed = puzzle.solve_cell(cell)
                         if changed:
-                            self.move_count += 1
+                            move_count += 1
                             cell_changed = True
 
-        self.cell_changed = cell_changed
+        return move_count
+
+    def evaluate_queue(self, puzzle):
+        """
+        Propagate the cells the board queued when they became single (see Sudoku.pop_single)
+        Removing a value from a peer can make that peer single, which queues it in turn,
+        so this keeps going until the queue is empty (like AC-3)
+        Return the number of cells solved
+        """
+        move_count = 0
+        position = puzzle.pop_single()
+        while position is not None and puzzle.is_consistent():
+            row, col = position
+            value = SINGLE_VALUE[puzzle.get_mask(row, col)]
+            if value:
+                if puzzle.solve_cell(Cell(row, col, value)):
+                    move_count += 1
+            position = puzzle.pop_single()
+
+        return move_count
+
+
+class TestNakedSingles(unittest.TestCase):
+    def test_worklist_same_as_rescan(self):
+        """
+        The worklist and the full rescan should reach the same board
+        """
+        from sudoku import Sudoku
+        puzzle_str = '''240 300 000
+                        000 520 407
+                        000 046 008
+                        610 700 084
+                        009 060 500
+                        730 005 061
+                        100 470 000
+                        302 051 000
+                        000 002 019'''
+        expected = Sudoku(puzzle_str)
+        NakedSingles(worklist=False).evaluate(expected)
+        actual = Sudoku(puzzle_str)
+        NakedSingles().evaluate(actual)
+
+        self.assertTrue(actual.is_board_solved())
+        self.assertEqual(expected.board, actual.board)
+
+
+if __name__ == '__main__':
+    unittest.main()
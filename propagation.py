@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+import unittest
+from typing import List
+
+from inference import InferenceRule
+from sudoku import CONTRADICTION, OK, SOLVED, Sudoku
+from utility import SolveStats
+
+
+def make_rules(rules) -> List[InferenceRule]:
+    """
+    Return an instance of each rule, rules given as classes are created once here
+    so the same instances can be applied to every board of a search (see InferenceRule.apply)
+    """
+    return [rule if isinstance(rule, InferenceRule) else rule() for rule in rules]
+
+
+def apply_rules(sudoku: Sudoku, rules: List[InferenceRule] = [], stats: SolveStats = None):
+    """
+    Apply each inference rule once, in the given order (this is what the search solvers do at every node)
+    Stops early when the board is solved or a rule finds a contradiction
+    Return the board's status: OK, CONTRADICTION or SOLVED (see Sudoku.status)
+    """
+    status = sudoku.status()
+    for rule_obj in make_rules(rules):
+        if status != OK:
+            break
+        rule_obj.apply(sudoku, stats)
+        status = sudoku.status()
+
+    return status
+
+
+def propagate(sudoku: Sudoku, rules: List[InferenceRule] = [], stats: SolveStats = None):
+    """
+    Apply the inference rules in the given priority order until none of them applies:
+    rule k is only tried when rules 1...k-1 did not change the board, and any change
+    goes back to rule 1 (see assignment description in sudoku.py)
+
+    Stops as soon as no rule changes the board (the fixpoint), the board is solved
+    or a rule finds a contradiction. Return the board's status: OK (stuck at the fixpoint),
+    CONTRADICTION or SOLVED (see Sudoku.status)
+    Rules can be given as classes or instances (see make_rules)
+    The rules add their counters to stats if it is given (rule_fires is the number of times each one changed the board)
+    """
+    rule_objs = make_rules(rules)
+
+    status = sudoku.status()
+    index = 0
+    while index < len(rule_objs) and status == OK:
+        rule_obj = rule_objs[index]
+        if not rule_obj.apply(sudoku, stats):
+            index += 1                      # rule did not apply, try the next one
+            continue
+
+        status = sudoku.status()
+        index = 0                           # board changed, start over from the first rule
+
+    return status
+
+
+EASY_STR = '''240 300 000
+000 520 407
+000 046 008
+610 700 084
+009 060 500
+730 005 061
+100 470 000
+302 051 000
+000 002 019'''
+
+
+class TestPropagate(unittest.TestCase):
+    def test_fixpoint(self):
+        """
+        Singles solve the hard puzzle without search, pairs never need to fire
+        """
+        from hidden_pairs import HiddenPairs
+        from hidden_singles import HiddenSingles
+        from naked_pairs import NakedPairs
+        from naked_singles import NakedSingles
+        sudoku = Sudoku('''170 000 006
+                           006 090 040
+                           300 070 000
+                           000 900 030
+                           094 020 870
+                           030 005 000
+                           000 060 001
+                           080 010 500
+                           500 000 082''')
+        stats = SolveStats()
+        self.assertEqual(SOLVED, propagate(sudoku, [NakedSingles, HiddenSingles, NakedPairs, HiddenPairs], stats))
+        self.assertTrue(sudoku.is_board_solved())
+        self.assertGreater(stats.rule_fires[NakedSingles.name], 0)
+        self.assertGreater(stats.rule_fires[HiddenSingles.name], 0)
+        self.assertEqual(0, stats.rule_fires[NakedPairs.name])
+        self.assertEqual(0, stats.rule_fires[HiddenPairs.name])
+
+    def test_reuse_rules(self):
+        """
+        The same rule instances can be applied to several boards
+        """
+        from hidden_singles import HiddenSingles
+        from naked_singles import NakedSingles
+        rules = make_rules([NakedSingles, HiddenSingles])
+        for puzzle_str in [EASY_STR, EASY_STR.replace('240', '200')]:
+            sudoku = Sudoku(puzzle_str)
+            eliminations = rules[0].apply(sudoku)
+            self.assertGreater(eliminations, 0)
+            self.assertEqual(SOLVED, propagate(sudoku, rules))
+            self.assertTrue(sudoku.is_board_solved())
+
+    def test_rule_state_on_board(self):
+        """
+        The units a rule has examined are kept on each board, so a rule shared with a fork
+        does not skip the fork's units or change what it has seen on the original
+        """
+        from naked_pairs import NakedPairs
+        rule = NakedPairs()
+        sudoku = Sudoku(EASY_STR)
+        rule.apply(sudoku)
+        seen = list(sudoku.rule_versions[rule])
+        fork = sudoku.fork()
+        self.assertFalse(fork.is_unit_dirty(rule, 0))
+        fork.remove_value(0, 2, 1)
+        rule.apply(fork)
+        self.assertEqual(seen, sudoku.rule_versions[rule])
+        self.assertNotEqual(seen, fork.rule_versions[rule])
+
+    def test_stuck(self):
+        """
+        With no rules nothing changes and propagation returns right away
+        """
+        sudoku = Sudoku()
+        self.assertEqual(OK, propagate(sudoku, []))
+        self.assertEqual(0, sudoku.change_count)
+
+    def test_contradiction(self):
+        """
+        A dead end is reported as CONTRADICTION instead of raising, and the rules stop right away
+        """
+        from hidden_singles import HiddenSingles
+        from naked_singles import NakedSingles
+        sudoku = Sudoku(EASY_STR)
+        sudoku.set_values(0, 2, [4])                # 4 is already at 0,1
+        self.assertEqual(CONTRADICTION, sudoku.status())
+        change_count = sudoku.change_count
+        self.assertEqual(CONTRADICTION, propagate(sudoku, [NakedSingles, HiddenSingles]))
+        self.assertEqual(CONTRADICTION, apply_rules(sudoku, [NakedSingles, HiddenSingles]))
+        self.assertEqual(change_count, sudoku.change_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
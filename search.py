@@ -0,0 +1,329 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+"""
+Iterative depth first search driver used by solve_simple_BT and solve_most_constrained_var
+
+Instead of recursing once per assigned cell, the search keeps an explicit stack of choice points,
+one per assigned cell: the cell, the values to try there and the board mark to undo back to.
+The board is changed in place and rolled back with Sudoku.mark/undo, as the recursive solvers did.
+
+Because all of the search state is in the Search object, a search can be paused (run for a number
+of steps), inspected (stack, path) and resumed (run again):
+
+    search = Search(sudoku, rules, selection=MOST_CONSTRAINED)
+    while search.run(steps=100) is None:
+        print(search.path())
+"""
+import unittest
+from typing import List
+
+from cell import Cell
+from inference import InferenceRule
+from most_constrained import ASCENDING, order_values
+from propagation import apply_rules, make_rules
+from sudoku import CONTRADICTION, SOLVED, Sudoku
+from utility import BUDGET_EXCEEDED, Budget, CancelToken, SolveStats
+
+# cell selection (see Search)
+FIXED = 'fixed'                         # row by row from the start cell, every cell gets a node (solve_simple_BT)
+MOST_CONSTRAINED = 'mcv'                # the unsolved cell with the fewest values (solve_most_constrained_var)
+
+
+def find_next_cell(row, col):
+    """
+    Return the cell after row,col in row-wise order, None after the last cell
+    """
+    if col < 8:
+        return row, col + 1
+    if row < 8:
+        return row + 1, 0
+    return None
+
+
+class ChoicePoint:
+    """
+    One assigned cell on the search stack
+    values are tried in order, next is the index of the next one to try, value is the one on the board now
+    and mark is the board mark from before it was assigned (None when no value is assigned)
+    """
+    __slots__ = ['row', 'col', 'values', 'next', 'value', 'mark']
+
+    def __init__(self, row, col, values):
+        self.row = row
+        self.col = col
+        self.values = values
+        self.next = 0
+        self.value = None
+        self.mark = None
+
+    def __repr__(self):
+        return f'({self.row}, {self.col}) = {self.value} of {self.values}'
+
+
+class Search:
+    """
+    Backtracking search on one board with an explicit stack of choice points
+    At every node the rules are applied once (see propagation.apply_rules), then a cell is picked
+    (FIXED or MOST_CONSTRAINED) and its values are tried in value_order (see most_constrained.order_values)
+    result is None until the search is done, then the solved board or -1 if there is no solution
+    limit is the number of solutions to find (None for all of them), the search only stops at a solution
+    once it has found that many, solutions counts them (see count_solutions)
+    budget limits the nodes, time or lets the caller cancel the search (see utility.Budget)
+    """
+
+    def __init__(self, sudoku: Sudoku, rules: List[InferenceRule] = [], selection=MOST_CONSTRAINED, start=(0, 0),
+                 value_order=ASCENDING, stats: SolveStats = None, budget: Budget = None, limit=1):
+        self.sudoku = sudoku
+        self.rules = make_rules(rules)          # created once, the same instances are used at every node
+        self.selection = selection
+        self.start = start                      # first cell for FIXED selection
+        self.value_order = value_order
+        self.stats = stats if stats is not None else SolveStats()
+        self.budget = budget
+        self.limit = limit
+        self.solutions = 0
+        self.stack = []                         # type: List[ChoicePoint]
+        self.node_pending = True                # the board at the top of the stack has not been expanded yet
+        self.result = None
+
+    @property
+    def finished(self):
+        return self.result is not None
+
+    def path(self):
+        """
+        Return the (row, col, value) assignments made by the search so far, outermost first
+        """
+        return [(point.row, point.col, point.value) for point in self.stack if point.value is not None]
+
+    def run(self, steps=None):
+        """
+        Run the search until it is done or for the given number of steps (expanding a node or trying
+        the next value of a choice point is one step), run can be called again to resume
+        Return the result: None if the search was paused, the solved board or -1 when it is done,
+        BUDGET_EXCEEDED if a limit of the budget was reached before the next node (the search can still be
+        resumed, i.e. after raising the limit)
+        """
+        self.stats.start()
+        try:
+            while self.result is None:
+                if steps is not None:
+                    if steps <= 0:
+                        break
+                    steps -= 1
+                if self.node_pending and self.budget is not None and not self.budget.check(self.stats):
+                    return BUDGET_EXCEEDED
+                self.step()
+        finally:
+            self.stats.stop()
+        return self.result
+
+    def step(self):
+        """
+        Do one step of the search
+        """
+        if self.node_pending:
+            self.expand()
+        else:
+            self.next_value()
+
+    def expand(self):
+        """
+        Apply the rules to the board at the top of the stack and push a choice point for the next cell
+        """
+        self.node_pending = False
+        self.stats.record_node(len(self.stack))
+
+        status = apply_rules(self.sudoku, self.rules, self.stats)
+        if status == CONTRADICTION:
+            self.fail()
+            return
+        if status == SOLVED:
+            if not self.found():
+                self.fail()
+            return
+
+        if self.selection == FIXED:
+            cell = find_next_cell(self.stack[-1].row, self.stack[-1].col) if self.stack else self.start
+        else:
+            cell = self.sudoku.most_constrained_cell()
+        if cell is None:
+            if not self.found():
+                self.fail()
+            return
+
+        row, col = cell
+        self.stack.append(ChoicePoint(row, col, order_values(self.sudoku, row, col, self.value_order)))
+
+    def next_value(self):
+        """
+        Undo the value assigned at the top choice point (if any) and assign its next valid value,
+        pop the choice point when it is out of values
+        """
+        sudoku = self.sudoku
+        point = self.stack[-1]
+        if point.mark is not None:
+            # the branch below this value failed
+            sudoku.undo(point.mark)
+            point.mark = None
+            point.value = None
+            self.stats.record_backtrack()
+
+        while point.next < len(point.values):
+            value = point.values[point.next]
+            point.next += 1
+            if not sudoku.is_value_allowed(point.row, point.col, value):
+                continue
+
+            # try the value on the same board, undo back to this mark if the branch fails
+            mark = sudoku.mark()
+            sudoku.set_values(point.row, point.col, [value])
+            sudoku.solve_cell(Cell(point.row, point.col, value))
+            if not sudoku.is_consistent():
+                # a peer ran out of values
+                sudoku.undo(mark)
+                self.stats.record_backtrack()
+                continue
+
+            point.mark = mark
+            point.value = value
+            if self.selection == FIXED and find_next_cell(point.row, point.col) is None:
+                # the last cell, there is no node below it (if the search goes on the next step undoes it)
+                if sudoku.is_board_solved():
+                    self.found()
+                return
+            self.node_pending = True
+            return
+
+        # out of values
+        self.stack.pop()
+        self.fail()
+
+    def found(self):
+        """
+        The board is solved, count it and stop the search if it is the last solution wanted
+        Return True if the search stopped, False if it should go on to look for more solutions
+        """
+        self.solutions += 1
+        if self.limit is not None and self.solutions >= self.limit:
+            self.result = self.sudoku
+            return True
+        return False
+
+    def fail(self):
+        """
+        The board at the top of the stack is a dead end (or a solution that was counted), go back to
+        the choice point below it, the search is done if there is none
+        """
+        if not self.stack:
+            self.result = -1
+
+
+def count_solutions(sudoku: Sudoku, limit=2, rules: List[InferenceRule] = [], selection=MOST_CONSTRAINED,
+                    stats: SolveStats = None, max_nodes=None, deadline=None, cancel: CancelToken = None):
+    """
+    Return the number of solutions of the board, counting stops once limit is reached (None to count all of them)
+    so the default limit of 2 tells a puzzle with no solution (0), a unique solution (1) or more (2) apart
+    The search is the same as the solvers' (the rules at every node, MOST_CONSTRAINED or FIXED cell selection)
+    on a fork of the board, so the board passed in is not changed
+    max_nodes, deadline and cancel limit the search (see utility.Budget)
+    """
+    search = Search(sudoku.fork(), rules, selection, stats=stats, budget=Budget(max_nodes, deadline, cancel),
+                    limit=limit)
+    if search.run() == BUDGET_EXCEEDED:
+        return BUDGET_EXCEEDED
+    return search.solutions
+
+
+class TestSearch(unittest.TestCase):
+    def test_find_next_cell(self):
+        self.assertEqual((0, 1), find_next_cell(0, 0))
+        self.assertEqual((4, 0), find_next_cell(3, 8))
+        self.assertIsNone(find_next_cell(8, 8))
+
+    def test_pause_resume(self):
+        """
+        A paused search can be inspected and resumed, and ends with the same board and counters as an uninterrupted one
+        """
+        from most_constrained import EVIL_SUDOKU
+        for selection in [FIXED, MOST_CONSTRAINED]:
+            stats = SolveStats()
+            expected = Search(Sudoku(EVIL_SUDOKU), selection=selection, stats=stats).run()
+
+            paused_stats = SolveStats()
+            search = Search(Sudoku(EVIL_SUDOKU), selection=selection, stats=paused_stats)
+            self.assertIsNone(search.run(steps=50))
+            self.assertFalse(search.finished)
+            self.assertEqual(len(search.path()), len([point for point in search.stack if point.mark is not None]))
+            for row, col, value in search.path():
+                self.assertEqual([value], search.sudoku.get_values(row, col))
+            while search.run(steps=50) is None:
+                pass
+
+            self.assertTrue(search.result.is_board_solved())
+            self.assertEqual(expected.get_bt_puzzle(), search.result.get_bt_puzzle())
+            self.assertEqual((stats.nodes, stats.backtracks), (paused_stats.nodes, paused_stats.backtracks))
+
+    def test_budget(self):
+        """
+        The search stops at the node limit with the counters so far, and can be resumed with a higher limit
+        """
+        from most_constrained import EVIL_SUDOKU
+        from utility import CancelToken
+        stats = SolveStats()
+        budget = Budget(max_nodes=10)
+        search = Search(Sudoku(EVIL_SUDOKU), stats=stats, budget=budget)
+        self.assertEqual(BUDGET_EXCEEDED, search.run())
+        self.assertEqual((10, 'max_nodes'), (stats.nodes, stats.exceeded))
+        budget.max_nodes = None
+        self.assertTrue(search.run().is_board_solved())
+
+        token = CancelToken()
+        token.cancel()
+        self.assertEqual(BUDGET_EXCEEDED, Search(Sudoku(EVIL_SUDOKU), budget=Budget(cancel=token)).run())
+
+    def test_count_solutions(self):
+        """
+        Count the solutions of a unique puzzle and of the same puzzle with givens taken out, with and
+        without rules and with both cell selections, against the fixed baseline on the plain grid
+        """
+        from fixed_baseline import backtrack_grid
+        from hidden_singles import HiddenSingles
+        from most_constrained import EVIL_SUDOKU
+        from naked_pairs import NakedPairs
+        from naked_singles import NakedSingles
+        evil = Sudoku(EVIL_SUDOKU)
+        loose = Sudoku(EVIL_SUDOKU.replace('6', '0', 1).replace('9', '0', 1))
+        expected = backtrack_grid(loose.get_bt_puzzle(), max_solutions=None)
+        self.assertGreater(expected, 2)
+
+        for rules in [[], [NakedSingles, HiddenSingles, NakedPairs]]:
+            for selection in [FIXED, MOST_CONSTRAINED]:
+                self.assertEqual(1, count_solutions(evil, rules=rules, selection=selection))
+                self.assertEqual(2, count_solutions(loose, rules=rules, selection=selection))
+                self.assertEqual(expected, count_solutions(loose, None, rules=rules, selection=selection))
+        self.assertEqual(Sudoku(EVIL_SUDOKU).get_bt_puzzle(), evil.get_bt_puzzle())
+
+        stats = SolveStats()
+        self.assertEqual(BUDGET_EXCEEDED, count_solutions(loose, None, stats=stats, max_nodes=3))
+        self.assertEqual('max_nodes', stats.exceeded)
+
+    def test_no_solution(self):
+        """
+        Two cells of row 0 can only be 1, the search runs out of values
+        """
+        sudoku = Sudoku()
+        sudoku.set_values(0, 0, [1, 2])
+        sudoku.set_values(0, 1, [1, 2])
+        sudoku.set_values(0, 2, [1, 2])
+        self.assertEqual(-1, Search(sudoku).run())
+        self.assertEqual(0, count_solutions(sudoku))
+
+
+if __name__ == '__main__':
+    unittest.main()
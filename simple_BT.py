@@ -1,112 +1,30 @@
-import copy
 from typing import List
 
-from cell import Cell
 from hidden_pairs import HiddenPairs
 from hidden_singles import HiddenSingles
 from hidden_triples import HiddenTriples
 from inference import InferenceRule
-from most_constrained import is_valid_cell_value
+from most_constrained import ASCENDING
 from naked_pairs import NakedPairs
 from naked_singles import NakedSingles
 from naked_triples import NakedTriples
+from search import FIXED, Search
 from sudoku import Sudoku
+from utility import Budget, CancelToken, SolveStats
 
 
-def find_next_cell(i, j):
-    # if j is not the last col
-    if j <= 7:
-        return i, j + 1
-    else:
-        if i <= 7:
-            return i + 1, 0
-        else:
-            return None
-
-
-class Counter:
-    def __init__(self):
-        self.value = 0
-
-    def increment(self):
-        self.value += 1
-
-    def __repr__(self):
-        return str(self.value)
-
-
-# counter = Counter()
-# counter = 0
-# from utility import counter
-import utility
-
-
-def solve_simple_BT(sudoku: Sudoku, rules: List[InferenceRule] = [], cell=(0, 0)):
-    # if sudoku.is_board_solved():
-    #     return sudoku
-    utility.counter += 1
-
-    for rule in rules:
-        if isinstance(rule, InferenceRule):
-            rule_obj = rule
-        else:
-            rule_obj = rule(sudoku)
-
-            # if isinstance(rule_obj, )
-        try:
-            rule_obj.evaluate()
-        except Exception as e:
-            return -1
-        # rule_obj.evaluate()
-
-        if isinstance(rule_obj, NakedSingles):
-            utility.rule_tracker.naked_singles += rule_obj.move_count
-        elif isinstance(rule_obj, HiddenSingles):
-            utility.rule_tracker.hidden_singles += rule_obj.move_count
-        elif isinstance(rule_obj, NakedPairs):
-            utility.rule_tracker.naked_pairs += rule_obj.move_count
-        elif isinstance(rule_obj, HiddenPairs):
-            utility.rule_tracker.hidden_pairs += rule_obj.move_count
-        elif isinstance(rule_obj, NakedTriples):
-            utility.rule_tracker.naked_triples += rule_obj.move_count
-        elif isinstance(rule_obj, HiddenTriples):
-            utility.rule_tracker.hidden_triples += rule_obj.move_count
-
-        sudoku = rule_obj.puzzle
-        if sudoku.is_board_solved():
-            return sudoku
-
-    i, j = cell
-    possible_values = sudoku.board[i][j]
-    next_cell = find_next_cell(i, j)
-
-    # print(f'{history}')
-    # print(f'{i}, {j}, {possible_values}')
-
-    for val in possible_values:
-
-        if is_valid_cell_value(val, sudoku.board, i, j):
-            # print(f'BT {i}, {j}, val = {val}')
-            new_sudoku = copy.deepcopy(sudoku)
-            new_sudoku.board[i][j] = [val]
-            # update val of all other cells
-            try:
-                new_sudoku.solve_cell(Cell(i, j, val))
-            except Exception as e:
-                # print('Error = ', e)
-                continue
-
-            if next_cell is not None:
-                possible_sudoku = solve_simple_BT(new_sudoku, rules, next_cell)
-
-                if possible_sudoku != -1:
-                    return possible_sudoku
-            else:
-                # this turn is the last cell
-                if new_sudoku.is_board_solved():
-                    return new_sudoku
-
-    return -1
+def solve_simple_BT(sudoku: Sudoku, rules: List[InferenceRule] = [], cell=(0, 0), stats: SolveStats = None,
+                    value_order=ASCENDING, max_nodes=None, deadline=None, cancel: CancelToken = None):
+    """
+    Fixed Baseline: backtracking search that assigns cells in a fixed order (row-wise, top to bottom)
+    starting at the given cell, running the inference rules at every search node
+    Return the solved board or -1 if there is no solution
+    Pass a SolveStats object to collect the node/backtrack/rule counters and time
+    max_nodes, deadline and cancel limit the search (see utility.Budget), the board is left part way solved
+    value_order is ASCENDING or LEAST_CONSTRAINING (see most_constrained.order_values)
+    The search itself is search.Search with FIXED cell selection
+    """
+    return Search(sudoku, rules, FIXED, cell, value_order, stats, Budget(max_nodes, deadline, cancel)).run()
 
 
 EVIL_SUDOKU = '''000 006 009
@@ -150,13 +68,11 @@ def test_simple_BT_func():
     rules = [NakedSingles, HiddenSingles, NakedPairs, HiddenPairs, NakedTriples, HiddenTriples]
     # rules = []
 
-    utility.counter = 0
-    utility.rule_tracker.reset()
-    solved_sudoku = solve_simple_BT(sudoku, rules, (0, 0))
+    stats = SolveStats()
+    solved_sudoku = solve_simple_BT(sudoku, rules, (0, 0), stats)
     print(f'{solved_sudoku=}')
-    print(f'{utility.counter=}')
     print(rules)
-    print(utility.rule_tracker)
+    print(stats)
     # print([rule.move_count for rule in rules])
 
 
@@ -1,6 +1,5 @@
 from typing import List
 
-import utility
 from hidden_pairs import HiddenPairs
 from hidden_singles import HiddenSingles
 from hidden_triples import HiddenTriples
@@ -8,46 +7,39 @@ from inference import InferenceRule
 from naked_pairs import NakedPairs
 from naked_singles import NakedSingles
 from naked_triples import NakedTriples
-from sudoku import Sudoku
-
-
-def solve_no_BT(sudoku: Sudoku, rules: List[InferenceRule] = []):
-    utility.counter += 1
-    MAX_LOOP = 1000
-
-    for loop in range(MAX_LOOP):
-        for rule in rules:
-            if isinstance(rule, InferenceRule):
-                rule_obj = rule
-            else:
-                rule_obj = rule(sudoku)
-
-            try:
-                rule_obj.evaluate()
-            except Exception as e:
-                return -1
-            # rule_obj.evaluate()
-
-            if isinstance(rule_obj, NakedSingles):
-                utility.rule_tracker.naked_singles += rule_obj.move_count
-            elif isinstance(rule_obj, HiddenSingles):
-                utility.rule_tracker.hidden_singles += rule_obj.move_count
-            elif isinstance(rule_obj, NakedPairs):
-                utility.rule_tracker.naked_pairs += rule_obj.move_count
-            elif isinstance(rule_obj, HiddenPairs):
-                utility.rule_tracker.hidden_pairs += rule_obj.move_count
-            elif isinstance(rule_obj, NakedTriples):
-                utility.rule_tracker.naked_triples += rule_obj.move_count
-            elif isinstance(rule_obj, HiddenTriples):
-                utility.rule_tracker.hidden_triples += rule_obj.move_count
-
-            sudoku = rule_obj.puzzle
-            if sudoku.is_board_solved():
-                return sudoku
+from propagation import propagate
+from sudoku import CONTRADICTION, SOLVED, Sudoku
+from utility import BUDGET_EXCEEDED, Budget, CancelToken, SolveStats
+
+
+def solve_no_BT(sudoku: Sudoku, rules: List[InferenceRule] = [], stats: SolveStats = None,
+                max_nodes=None, deadline=None, cancel: CancelToken = None):
+    """
+    Solve the puzzle with the inference rules only (no search)
+    Return the solved board, None if the rules get stuck before the board is solved or -1 on a dead end
+    Pass a SolveStats object to collect the rule counters and time
+    max_nodes, deadline and cancel: see utility.Budget, propagation is a single node so they are only checked
+    before it starts
+    """
+    if stats is None:
+        stats = SolveStats()
+    if not Budget(max_nodes, deadline, cancel).check(stats):
+        return BUDGET_EXCEEDED
+    stats.start()
+    stats.record_node(0)
+
+    try:
+        status = propagate(sudoku, rules, stats)
+    finally:
+        stats.stop()
+
+    if status == CONTRADICTION:
+        return -1
+    if status == SOLVED:
+        return sudoku
 
     return None
 
-
 if __name__ == '__main__':
 
     EVIL_SUDOKU = '''000 006 009
@@ -61,5 +53,9 @@ if __name__ == '__main__':
     700 100 000
     '''
     rules = [NakedSingles, HiddenSingles, NakedPairs, HiddenPairs, NakedTriples, HiddenTriples]
-    sudoku = solve_no_BT(Sudoku(EVIL_SUDOKU), rules)
+    sudoku = Sudoku(EVIL_SUDOKU)
+    stats = SolveStats()
+    if solve_no_BT(sudoku, rules, stats) is None:
+        print('Stuck without backtracking')
     sudoku.print()
+    print(stats)
@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+"""
+One engine for the naked and hidden subset rules (singles, pairs, triples and quads)
+
+Naked subset of size k: k cells in a unit whose possible values together are only k values.
+    Those values can be removed from every other cell in the unit
+Hidden subset of size k: k values that can only go in the same k cells of a unit.
+    Every other value can be removed from those cells
+
+Both work on the candidate masks of the 9 cells in a unit (see masks.py). The hidden search runs
+on the dual masks (for each value, the positions where it can go) so it is the naked search with
+cells and values swapped. The rule classes (NakedPairs, HiddenTriples, ...) are SubsetRule with
+a size and a kind set.
+"""
+import itertools
+import unittest
+
+from inference import InferenceRule
+from masks import MASK_POSITIONS, MASK_VALUES, POPCOUNT, VALUE_BITS, position_masks
+from units import UNIT_COORDS
+
+MAX_SIZE = 4
+
+# COMBINATIONS[n][k] -> every way to pick k of the indexes 0...n-1 (n up to 9, k up to MAX_SIZE), built once at import
+COMBINATIONS = tuple(tuple(tuple(itertools.combinations(range(n), k)) for k in range(MAX_SIZE + 1)) for n in range(10))
+
+
+def find_naked_subset(masks, size):
+    """
+    Given the candidate masks of the cells in a unit, find a naked subset of the given size
+    Only a subset whose values are still possible in another cell is returned (something can be removed)
+    Return (cells, values) as a mask of the subset's positions in the unit and a mask of its values,
+    or None if there is no such subset
+    """
+    # cells with 2 to size possible values can be part of a subset (a single is only a subset of size 1)
+    smallest = 1 if size == 1 else 2
+    candidates = [position for position, mask in enumerate(masks) if smallest <= POPCOUNT[mask] <= size]
+
+    for combination in COMBINATIONS[len(candidates)][size]:
+        union = 0
+        cells = 0
+        for index in combination:
+            union |= masks[candidates[index]]
+            cells |= 1 << candidates[index]
+        if POPCOUNT[union] != size:
+            continue
+
+        useful = False
+        for position, mask in enumerate(masks):
+            if cells >> position & 1 or not mask & union:
+                continue
+            if not mask & ~union:
+                break                       # another cell only has subset values, the unit has no solution
+            useful = True
+        else:
+            if useful:
+                return cells, union
+
+    return None
+
+
+def find_hidden_subset(masks, size):
+    """
+    Given the candidate masks of the cells in a unit, find a hidden subset of the given size
+    Only a subset whose cells still have other values is returned (something can be removed)
+    Return (cells, values) as a mask of the subset's positions in the unit and a mask of its values,
+    or None if there is no such subset
+    """
+    # for each value, the positions in the unit where it could be (see masks.position_masks)
+    # values that can go in 1 (size 1) or 2 to size cells can be part of a subset
+    positions = position_masks(masks)
+    smallest = 1 if size == 1 else 2
+    candidates = [value for value in range(1, 10) if smallest <= POPCOUNT[positions[value]] <= size]
+
+    for combination in COMBINATIONS[len(candidates)][size]:
+        union = 0
+        values = 0
+        for index in combination:
+            union |= positions[candidates[index]]
+            values |= VALUE_BITS[candidates[index]]
+        if POPCOUNT[union] != size:
+            continue
+
+        if any(masks[position] & ~values for position in MASK_POSITIONS[union]):
+            return union, values
+
+    return None
+
+
+def find_subset(masks, size, hidden):
+    """
+    Find a naked (hidden=False) or hidden (hidden=True) subset of the given size, see find_naked_subset
+    """
+    if hidden:
+        return find_hidden_subset(masks, size)
+    return find_naked_subset(masks, size)
+
+
+def subset_changes(masks, cells, values, hidden):
+    """
+    Return the (position, new mask) changes a subset found by find_subset makes to the unit's masks
+    """
+    if hidden:
+        # only the subset values are left in the subset cells
+        return [(position, masks[position] & values) for position in MASK_POSITIONS[cells]
+                if masks[position] & ~values]
+
+    # the subset values are removed from every other cell
+    return [(position, mask & ~values) for position, mask in enumerate(masks)
+            if not cells >> position & 1 and mask & values]
+
+
+class SubsetRule(InferenceRule):
+    """
+    Naked or hidden subset rule of a given size (see module description)
+    Subclasses only set the name, size (1 to MAX_SIZE) and hidden
+    """
+    name = 'subsets'
+    size = 2
+    hidden = False
+
+    def evaluate(self, puzzle):
+        """
+        Look for subsets in every row, col and region until none of them change
+        Return the number of moves, one for every unit that changed
+        """
+        move_count = 0
+        cell_changed = True  # run init at least once
+        while cell_changed:  # keep running when a change is made
+            cell_changed = False  # this ensures a change is made every loop
+
+            # check rows, cols and regions (see units.py), skipping units that did not change since the last pass
+            for unit in range(27):
+                if not puzzle.is_consistent():
+                    return move_count
+                if not puzzle.is_unit_dirty(self, unit):
+                    continue
+                if self.execute_group(puzzle, unit):
+                    move_count += 1
+                    cell_changed = True
+
+        return move_count
+
+    def execute_group(self, puzzle, unit, masks=None):
+        """
+        Given a unit (see units.py), find every subset and remove the values it rules out from the board
+        masks are the candidate masks of the unit's cells, read from the board if not given
+        Return True if a cell changed, else False
+        """
+        if masks is None:
+            masks = puzzle.get_unit_masks(unit)
+        masks = list(masks)                     # updated as changes are made
+        coords = UNIT_COORDS[unit]
+
+        changed = False
+        subset = find_subset(masks, self.size, self.hidden)
+        while subset is not None:
+            for position, new_mask in subset_changes(masks, subset[0], subset[1], self.hidden):
+                row, col = coords[position]
+                puzzle.set_values(row, col, MASK_VALUES[new_mask])
+                masks[position] = new_mask
+                changed = True
+            subset = find_subset(masks, self.size, self.hidden)
+
+        return changed
+
+
+class TestSubsets(unittest.TestCase):
+    def test_combinations(self):
+        self.assertEqual(126, len(COMBINATIONS[9][4]))
+        self.assertEqual(((),), COMBINATIONS[0][0])
+        self.assertEqual((), COMBINATIONS[2][3])
+
+    def test_naked_and_hidden(self):
+        """
+        Find a naked triple and a hidden triple in the same unit
+        """
+        from masks import values_to_mask
+        masks = [values_to_mask(values) for values in
+                 [[1, 2], [1, 2, 3], [2, 3], [3, 4, 5], [4, 5, 6, 7, 9], [4, 5, 6, 8], [6, 7, 8, 9], [4, 5], [5, 6]]]
+        # 1, 2 and 3 are a naked triple in the first 3 cells
+        self.assertEqual((0b111, 0b111), find_naked_subset(masks, 3))
+        self.assertEqual([(3, values_to_mask([4, 5]))], subset_changes(masks, 0b111, 0b111, False))
+        self.assertIsNone(find_naked_subset(masks, 2))
+
+        # 7, 8 and 9 are a hidden triple in cells 4, 5 and 6
+        cells, values = find_hidden_subset(masks, 3)
+        self.assertEqual((0b1110000, values_to_mask([7, 8, 9])), (cells, values))
+        self.assertEqual([(4, values_to_mask([7, 9])), (5, VALUE_BITS[8]), (6, values_to_mask([7, 8, 9]))],
+                         subset_changes(masks, cells, values, True))
+
+    def test_singles(self):
+        """
+        Size 1 subsets are the naked and hidden singles
+        """
+        from masks import values_to_mask
+        masks = [values_to_mask(values) for values in
+                 [[1], [1, 2, 3], [2, 3], [2, 3, 4], [5], [6], [7], [8], [9]]]
+        cells, values = find_naked_subset(masks, 1)
+        self.assertEqual((0b1, VALUE_BITS[1]), (cells, values))
+        self.assertEqual([(1, values_to_mask([2, 3]))], subset_changes(masks, cells, values, False))
+        self.assertEqual((0b1000, VALUE_BITS[4]), find_hidden_subset(masks, 1))
+
+    def test_rule(self):
+        """
+        A subset rule of each kind and size runs on a board without breaking it
+        """
+        from sudoku import Sudoku
+        for hidden in [False, True]:
+            for size in range(1, MAX_SIZE + 1):
+                rule = type('Rule', (SubsetRule,), {'size': size, 'hidden': hidden})()
+                sudoku = Sudoku('''000 006 009
+                                   090 300 108
+                                   076 000 402
+                                   000 800 005
+                                   000 502 000
+                                   900 003 000
+                                   409 000 830
+                                   605 004 090
+                                   700 100 000''')
+                rule.apply(sudoku)
+                self.assertTrue(sudoku.is_consistent())
+                self.assertTrue(sudoku.is_board_valid())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,10 +5,15 @@
 # Joe Nguyen
 # Matthew Pacey
 import copy
+import itertools
 from typing import Dict, List, Literal
 
 from unicodedata import digit
 from cell import Cell
+from masks import ALL_VALUES, MASK_VALUES, POPCOUNT, SINGLE_POSITION, SINGLE_VALUE, VALUE_BITS, values_to_mask
+from units import CELL_UNIT_POSITIONS, CELL_UNITS, COORDS, PEER_COORDS, PEERS, REGION_OF, UNIT_COORDS, UNITS
+from fixed_baseline import backtrack_grid
+from utility import SolveStats
 # from most_constrained import get_sorted_constrained_vars, is_valid_cell_value
 # from naked_singles import NakedSingles
 # from hidden_singles import HiddenSingles
@@ -16,7 +21,6 @@ from cell import Cell
 # from hidden_pairs import HiddenPairs
 # from naked_triples import NakedTriples
 # from hidden_triples import HiddenTriples
-import math
 
 # from hidden_pairs import HiddenPairs
 # from hidden_singles import HiddenSingles
@@ -80,10 +84,24 @@ EMPTY_STR = '''000 000 000
 000 000 000
 000 000 000'''
 
+# how much checking is done every time a cell's possible values change (see Sudoku.check_cell)
+# contradictions are never raised, they are reported by Sudoku.status() in every mode
+CHECK_OFF = 0               # no checking, the running counters already find contradictions as cells change
+CHECK_FULL = 1              # debug: verify the running counters against the whole board after every change
+
+# result of Sudoku.status(), propagation and the inference rules
+OK = 0                      # no contradiction, cells left to solve
+CONTRADICTION = 1           # a cell has no values left, a single value is repeated in a unit or a value has
+                            # no place left in a unit (dead end)
+SOLVED = 2                  # every cell has a single value with no repeats
+
+# unit versions are taken from one counter shared by all boards, so the same version number always
+# means the same unit contents (even across forks and undo), rules use them to skip unchanged units
+unit_version_clock = itertools.count(1)
 
 class Sudoku:
 
-    def __init__(self, puzzle_str=EMPTY_STR):
+    def __init__(self, puzzle_str=EMPTY_STR, check_mode=CHECK_OFF):
         """
         Init the Sudoku board with a puzzle string
         The board is a 3d array: board[row][col][values] where:
@@ -92,7 +110,12 @@ class Sudoku:
             If a cell starts off as blank (0 in puzzle_str input) that means values 1-9 are valid
             The inference rules will reduce this list as they execute
             If values has only one number, that is the final value
+        check_mode controls how much validation is done whenever a cell changes (CHECK_OFF or CHECK_FULL)
         """
+        self.check_mode = check_mode
+        self.trail = None                       # changes recorded for undo (see mark), None until first used
+        self.change_count = 0                   # number of changes made with set_values/remove_value
+        self.elimination_count = 0              # number of possible values removed by those changes
         self.board = []  # type: Dict[int, Dict[int, List]]
         self.build_board_from_str(puzzle_str)
         self.init_constraints()
@@ -122,52 +145,438 @@ class Sudoku:
             raise Exception('Invalid puzzle, expected 81 numbers (0 for blank)')
 
         # init board (9x9 grid where each cell is a list of acceptable values 1-9)
-        self.board = [[[0 for cell in range(9)] for col in range(9)] for row in range(9)]
+        board = [[[0 for cell in range(9)] for col in range(9)] for row in range(9)]
         row = 0
         col = 0
         for cell in puzzle_str.strip():
             cell = int(cell)
             if cell == 0:
-                self.board[row][col] = list(range(1, 10))
+                board[row][col] = list(range(1, 10))
             else:
-                self.board[row][col] = [cell]
+                board[row][col] = [cell]
 
             col += 1
             if col == 9:  # at the final column, move to the next row
                 col = 0
                 row += 1
 
+        self.board = board
+        self.owned_rows = [True] * 9            # rows shared with a fork are copied before they are changed
+        self.recount()
+
+    def recount(self):
+        """
+        Rebuild the running counters (solved cells, values placed in each unit, invalid units)
+        from the current board. This is done when the board is loaded, after that the counters
+        are updated by set_values/remove_value as cells change
+        """
+        self.solved_count = 0                   # cells with a single value
+        self.empty_count = 0                    # cells with no possible values
+        self.unit_counts = [0] * (27 * 9)       # [unit * 9 + value - 1] -> number of cells in unit solved to value
+        self.unit_errors = [0] * 27             # [unit] -> repeated values + empty cells + values with no place in the unit
+        self.error_count = 0                    # sum of unit_errors
+        self.position_masks = [ALL_VALUES] * (27 * 9)   # [unit * 9 + value - 1] -> positions (0-8) in unit where value is possible
+        self.singles_queue = []                 # cells that became single, waiting to be propagated (see pop_single)
+        self.singles_head = 0                   # next entry of singles_queue to pop
+        self.hidden_queue = []                  # unit * 9 + value - 1 for values left in one place (see pop_hidden_single)
+        self.hidden_head = 0                    # next entry of hidden_queue to pop
+        self.unit_versions = [next(unit_version_clock) for unit in range(27)]   # [unit] -> changes when a cell in the unit changes
+        self.rule_versions = {}                 # rule -> [unit] -> unit version when the rule last examined it
+        self.cell_degrees = [20] * 81           # [index] -> number of peers with more than one possible value
+        self.size_cells = [0] * 10              # [size] -> bit index is set for each cell with size (2-9) possible values
+        self.size_cells[9] = (1 << 81) - 1
+        for index in range(81):
+            row, col = COORDS[index]
+            self.update_counters(index, ALL_VALUES, self.get_mask(row, col))
+
+    def update_counters(self, index, old_mask, new_mask):
+        """
+        Update the running counters after the cell at index (row * 9 + col) changed from old_mask to new_mask
+        This also gives the cell's row, col and region a new version number (see unit_versions)
+        """
+        unit_versions = self.unit_versions
+        for unit in CELL_UNITS[index]:
+            unit_versions[unit] = next(unit_version_clock)
+
+        # move the cell in or out of the positions of each value that changed, a value left in one place
+        # of a unit is queued as a hidden single and a value with no place left is an error
+        changed_values = MASK_VALUES[old_mask ^ new_mask]
+        if changed_values:
+            position_masks = self.position_masks
+            for unit, position in zip(CELL_UNITS[index], CELL_UNIT_POSITIONS[index]):
+                bit = 1 << position
+                for value in changed_values:
+                    key = unit * 9 + value - 1
+                    old_positions = position_masks[key]
+                    positions = old_positions ^ bit
+                    position_masks[key] = positions
+                    if positions == 0 or old_positions == 0:
+                        change = 1 if positions == 0 else -1
+                        self.unit_errors[unit] += change
+                        self.error_count += change
+                    elif positions < old_positions and POPCOUNT[positions] == 1:
+                        self.hidden_queue.append(key)
+
+        old_value = SINGLE_VALUE[old_mask]
+        new_value = SINGLE_VALUE[new_mask]
+        if old_value != new_value:
+            unit_counts = self.unit_counts
+            unit_errors = self.unit_errors
+            if old_value:
+                self.solved_count -= 1
+                for unit in CELL_UNITS[index]:
+                    key = unit * 9 + old_value - 1
+                    unit_counts[key] -= 1
+                    if unit_counts[key] == 1:   # value no longer repeated
+                        unit_errors[unit] -= 1
+                        self.error_count -= 1
+            if new_value:
+                self.solved_count += 1
+                self.singles_queue.append(index)
+                for unit in CELL_UNITS[index]:
+                    key = unit * 9 + new_value - 1
+                    unit_counts[key] += 1
+                    if unit_counts[key] == 2:   # value now repeated
+                        unit_errors[unit] += 1
+                        self.error_count += 1
+
+        if (old_mask == 0) != (new_mask == 0):
+            change = 1 if new_mask == 0 else -1
+            self.empty_count += change
+            for unit in CELL_UNITS[index]:
+                self.unit_errors[unit] += change
+                self.error_count += change
+
+        # move the cell to the bucket for its new size, when it is solved (or unsolved again by undo)
+        # its peers' degrees change
+        old_size = POPCOUNT[old_mask]
+        new_size = POPCOUNT[new_mask]
+        if old_size != new_size:
+            size_cells = self.size_cells
+            bit = 1 << index
+            if old_size > 1:
+                size_cells[old_size] &= ~bit
+            if new_size > 1:
+                size_cells[new_size] |= bit
+            if (old_size > 1) != (new_size > 1):
+                change = 1 if new_size > 1 else -1
+                cell_degrees = self.cell_degrees
+                for peer in PEERS[index]:
+                    cell_degrees[peer] += change
+
+    def most_constrained_cell(self):
+        """
+        Return the (row, col) of the unsolved cell with the fewest possible values, ties broken by the most
+        unsolved peers (then the lowest index), or None if no cell has more than one value
+        The cells are kept in buckets by size as they change (and by undo), only the smallest non-empty
+        bucket is looked at
+        """
+        for size in range(2, 10):
+            cells = self.size_cells[size]
+            if cells:
+                cell_degrees = self.cell_degrees
+                best = None
+                best_degree = -1
+                while cells:
+                    low = cells & -cells
+                    index = low.bit_length() - 1
+                    if cell_degrees[index] > best_degree:
+                        best = index
+                        best_degree = cell_degrees[index]
+                    cells ^= low
+                return COORDS[best]
+        return None
+
+    def get_values(self, row, col) -> List[int]:
+        """
+        Return the list of possible values for the cell at row,col
+        Callers should treat the list as read only and use set_values/remove_value to update the board
+        """
+        return self.board[row][col]
+
+    def get_mask(self, row, col) -> int:
+        """
+        Return the possible values for the cell at row,col as a 9-bit candidate mask (see masks.py)
+        """
+        return values_to_mask(self.board[row][col])
+
+    def set_values(self, row, col, values):
+        """
+        Replace the possible values for the cell at row,col (nothing is done if the values are the same)
+        """
+        old_mask = values_to_mask(self.board[row][col])
+        new_mask = values_to_mask(values)
+        if old_mask == new_mask:
+            return
+        if not self.owned_rows[row]:
+            self.unshare_row(row)
+        self.board[row][col] = list(MASK_VALUES[new_mask])
+        self.cell_changed(row * 9 + col, old_mask, new_mask)
+
+    def remove_value(self, row, col, value):
+        """
+        Remove a single possible value from the cell at row,col
+        Return True if the value was removed, False if it was not possible for that cell
+        """
+        if value not in self.board[row][col]:
+            return False
+        if not self.owned_rows[row]:
+            self.unshare_row(row)
+        values = self.board[row][col]
+        old_mask = values_to_mask(values)
+        values.remove(value)
+        self.cell_changed(row * 9 + col, old_mask, old_mask & ~VALUE_BITS[value])
+        return True
+
+    def restore_mask(self, index, mask):
+        """
+        Put back the possible values (as a mask) for the cell at index without recording or checking the change
+        Used by undo, backends that store the board differently override this
+        """
+        row, col = COORDS[index]
+        if not self.owned_rows[row]:
+            self.unshare_row(row)
+        self.board[row][col] = list(MASK_VALUES[mask])
+
+    def unshare_row(self, row):
+        """
+        Give this board its own copy of a row it shares with a fork (copy on write)
+        """
+        self.board[row] = [list(values) for values in self.board[row]]
+        self.owned_rows[row] = True
+
+    def fork(self):
+        """
+        Return an independent copy of this board that is cheap to make
+        The copy shares the rows of the board with this one, a row is only copied (by whichever board
+        changes it first) when one of its cells changes. The counters are copied and the new board
+        starts without a trail (see mark)
+        """
+        new = copy.copy(self)
+        new.trail = None
+        new.unit_counts = list(self.unit_counts)
+        new.unit_errors = list(self.unit_errors)
+        new.unit_versions = list(self.unit_versions)
+        new.rule_versions = {rule: list(seen) for rule, seen in self.rule_versions.items()}
+        new.position_masks = list(self.position_masks)
+        new.cell_degrees = list(self.cell_degrees)
+        new.size_cells = list(self.size_cells)
+        new.singles_queue = self.singles_queue[self.singles_head:]
+        new.singles_head = 0
+        new.hidden_queue = self.hidden_queue[self.hidden_head:]
+        new.hidden_head = 0
+        self.share_board(new)
+        return new
+
+    def share_board(self, new):
+        """
+        Share the board storage between this board and a new fork of it, both copy on write from now on
+        """
+        new.board = list(self.board)
+        self.owned_rows = [False] * 9
+        new.owned_rows = [False] * 9
+
+    def snapshot(self):
+        """
+        Return a copy of the current board (see fork), i.e. to keep an alternative branch
+        or to hand the board to another process
+        """
+        return self.fork()
+
+    def cell_changed(self, index, old_mask, new_mask):
+        """
+        Called by set_values/remove_value every time the cell at index (row * 9 + col) changes
+        Records the change for undo, updates the counters and checks the board (see check_mode)
+        """
+        self.change_count += 1
+        self.elimination_count += POPCOUNT[old_mask & ~new_mask]
+        if self.trail is not None:
+            self.trail.append((index, old_mask))
+        self.update_counters(index, old_mask, new_mask)
+        if self.check_mode:
+            row, col = COORDS[index]
+            self.check_cell(row, col)
+
+    def mark(self):
+        """
+        Return a mark for the current state of the board that undo() can roll back to
+        This turns on recording of changes (the trail) if it is not already on, so backtracking
+        searches can undo a failed branch instead of copying the whole board
+        """
+        if self.trail is None:
+            self.trail = []
+        return len(self.trail), len(self.singles_queue), self.singles_head, len(self.hidden_queue), self.hidden_head
+
+    def undo(self, mark):
+        """
+        Undo every change made since mark() returned the given mark
+        """
+        trail_length, queue_length, queue_head, hidden_length, hidden_head = mark
+        trail = self.trail
+        while len(trail) > trail_length:
+            index, old_mask = trail.pop()
+            row, col = COORDS[index]
+            new_mask = self.get_mask(row, col)
+            self.restore_mask(index, old_mask)
+            self.update_counters(index, new_mask, old_mask)
+
+        # the queues of new singles go back to what they were at the mark as well
+        del self.singles_queue[queue_length:]
+        self.singles_head = queue_head
+        del self.hidden_queue[hidden_length:]
+        self.hidden_head = hidden_head
+
+    def pop_single(self):
+        """
+        Return the (row, col) of the next cell that became single since it was last popped, None if there are none
+        Every cell is queued when it is reduced to one value so naked singles only need to look at these cells.
+        The cell may have changed again since it was queued, so callers should check its values
+        """
+        if self.singles_head == len(self.singles_queue):
+            return None
+        index = self.singles_queue[self.singles_head]
+        self.singles_head += 1
+        return COORDS[index]
+
+    def pop_hidden_single(self):
+        """
+        Return (row, col, value) for the next hidden single: an unsolved cell that is the only place left
+        for value in one of its units, None if there are none
+        Values are queued when they are removed from all but one cell of a unit (see update_counters),
+        queued values that have been solved since then are skipped
+        """
+        hidden_queue = self.hidden_queue
+        while self.hidden_head < len(hidden_queue):
+            key = hidden_queue[self.hidden_head]
+            self.hidden_head += 1
+            position = SINGLE_POSITION[self.position_masks[key]]
+            if position is None:
+                continue                        # no place left (a contradiction)
+            row, col = UNIT_COORDS[key // 9][position]
+            if POPCOUNT[self.get_mask(row, col)] > 1:
+                return row, col, key % 9 + 1
+        return None
+
+    def get_positions(self, unit, value):
+        """
+        Return the positions (0-8) in the given unit where value is still possible as a 9-bit mask
+        """
+        return self.position_masks[unit * 9 + value - 1]
+
+    def check_cell(self, row, col):
+        """
+        Called after the possible values for the cell at row,col change
+        A change that makes the board invalid is not an error, it is reported by status() (CONTRADICTION)
+        In CHECK_FULL mode the running counters are verified against the whole board (slow, for debugging)
+        and an exception is raised if they do not match, as that is a bug and not a dead end
+        """
+        if self.check_mode == CHECK_FULL:
+            self.verify_counters()
+
+    def is_unit_dirty(self, rule, unit):
+        """
+        Return True if the given unit (see units.py) changed since rule last examined it on this board, else False
+        Rules that only look inside one unit at a time can skip units that are not dirty
+        Calling this marks the unit as examined by rule, the versions seen are kept per board so
+        the same rule object can be used on any number of boards
+        """
+        seen = self.rule_versions.get(rule)
+        if seen is None:
+            seen = self.rule_versions[rule] = [0] * 27
+        version = self.unit_versions[unit]
+        if seen[unit] == version:
+            return False
+        seen[unit] = version
+        return True
+
+    def is_value_allowed(self, row, col, value):
+        """
+        Return True if no peer of the cell at row,col is solved to value, else False
+        Uses the solved value counts of the cell's units (see update_counters) instead of looking at the peers
+        """
+        own = 1 if SINGLE_VALUE[self.get_mask(row, col)] == value else 0     # the cell itself may be solved to value
+        unit_counts = self.unit_counts
+        for unit in CELL_UNITS[row * 9 + col]:
+            if unit_counts[unit * 9 + value - 1] > own:
+                return False
+        return True
+
+    def verify_counters(self):
+        """
+        Recount the solved/empty cells, unit errors and cell buckets from the board and raise an exception
+        if the running counters (see update_counters) do not match
+        """
+        masks = [self.get_mask(row, col) for row, col in COORDS]
+        unit_counts = [0] * (27 * 9)
+        for index, mask in enumerate(masks):
+            value = SINGLE_VALUE[mask]
+            if value:
+                for unit in CELL_UNITS[index]:
+                    unit_counts[unit * 9 + value - 1] += 1
+        position_masks = [sum(1 << position for position, index in enumerate(cells) if masks[index] & VALUE_BITS[value])
+                          for cells in UNITS for value in range(1, 10)]
+        unit_errors = [sum(1 for count in unit_counts[unit * 9:unit * 9 + 9] if count > 1) +
+                       sum(1 for index in cells if masks[index] == 0) +
+                       position_masks[unit * 9:unit * 9 + 9].count(0)
+                       for unit, cells in enumerate(UNITS)]
+
+        cell_degrees = [sum(1 for peer in PEERS[index] if POPCOUNT[masks[peer]] > 1) for index in range(81)]
+        size_cells = [0] * 10
+        for index, mask in enumerate(masks):
+            if POPCOUNT[mask] > 1:
+                size_cells[POPCOUNT[mask]] |= 1 << index
+
+        expected = (sum(1 for mask in masks if SINGLE_VALUE[mask]), masks.count(0), unit_counts, unit_errors, position_masks,
+                    cell_degrees, size_cells)
+        actual = (self.solved_count, self.empty_count, self.unit_counts, self.unit_errors, self.position_masks,
+                  self.cell_degrees, self.size_cells)
+        if expected != actual or self.error_count != sum(unit_errors):
+            raise Exception('Board counters do not match the board')
+        return True
+
+    def status(self):
+        """
+        Return SOLVED, CONTRADICTION or OK for the current board without scanning it (see update_counters)
+        """
+        if self.error_count:
+            return CONTRADICTION
+        if self.solved_count == 81:
+            return SOLVED
+        return OK
+
+    def is_unit_valid(self, unit):
+        """
+        Return True if the given unit (see units.py) has no empty cells and no repeated single values
+        """
+        return self.unit_errors[unit] == 0
+
+    def is_consistent(self):
+        """
+        Return True if no unit has an empty cell or a repeated single value (same as is_board_valid
+        without scanning the board)
+        """
+        return self.error_count == 0
+
     def is_board_solved(self):
         """
         The board is solved when all cells are filled and all cells are valid
         (1-9 in each row, col and region, no repeats)
         """
-        return self.is_board_filled() and self.is_board_valid()
+        return self.solved_count == 81 and self.error_count == 0
 
     def get_solved_cell_count(self):
         """
         Return the number of solved cells (only have 1 possible value)
         :return:
         """
-        count = 0
-        for row in range(9):
-            for col in range(9):
-                if len(self.board[row][col]) == 1:
-                    count += 1
-
-        return count
+        return self.solved_count
 
     def is_board_filled(self):
         """
         Return True if the all cells have a single value, else False
         :return:
         """
-        for row in range(9):
-            for col in range(9):
-                if len(self.board[row][col]) > 1:
-                    return False
-
-        return True
+        return self.solved_count + self.empty_count == 81
 
     def is_board_valid(self):
         """
@@ -175,24 +584,10 @@ class Sudoku:
         Only cells with a single value are checked (cells with multiple values are not final values)
         To be consistent each row, col and 3x3 grid can only have 1-9 (no repeats)
         """
-        # check all rows
-        for row in range(9):
-            cells = self.get_row(row)
-            if not self.is_cell_group_valid(cells):
-                # self.print()
-                raise Exception(f'Row invalid: {row}')
-
-        # check all cols
-        for col in range(9):
-            cells = self.get_row(row)
-            if not self.is_cell_group_valid(cells):
-                raise Exception(f'Col invalid: {col}')
-
-        # check all regions
-        for reg in range(9):
-            cells = self.get_region(reg)
-            if not self.is_cell_group_valid(cells):
-                raise Exception(f'Region invalid: {reg}')
+        for unit, cells in enumerate(UNIT_COORDS):
+            values = [self.get_values(row, col) for row, col in cells]
+            if not self.is_group_valid(values):
+                return False
 
         return True
 
@@ -225,7 +620,7 @@ class Sudoku:
             for row in range(9):
                 # board += '(' + str(row) + ') '
                 for col in range(9):
-                    cell = self.board[row][col]
+                    cell = self.get_values(row, col)
                     if len(cell) == 1:
                         board += str(cell[0])
                         solved += 1
@@ -246,7 +641,7 @@ class Sudoku:
             for row in range(9):
 
                 for col in range(9):
-                    cell = self.board[row][col]
+                    cell = self.get_values(row, col)
                     if len(cell) == 1:
                         bigBoard[row * 3 + 1][col * 3 + 1] = str(cell[0])  # put values in center
                         solved += 1
@@ -304,7 +699,7 @@ class Sudoku:
         for col in range(9):
             if omit_col is not None and omit_col == col:
                 continue
-            cell = Cell(row, col, self.board[row][col])
+            cell = Cell(row, col, self.get_values(row, col))
             cells.append(cell)
 
         return cells
@@ -319,7 +714,7 @@ class Sudoku:
         for row in range(9):
             if omit_row is not None and omit_row == row:
                 continue
-            cell = Cell(row, col, self.board[row][col])
+            cell = Cell(row, col, self.get_values(row, col))
             cells.append(cell)
 
         return cells
@@ -331,15 +726,10 @@ class Sudoku:
         Default behavior is to include the given cll
         """
         cells = []
-
-        row_start = (row // 3) * 3  # start of the subgroup row and col
-        col_start = (col // 3) * 3  # round down to previous 3 group
-        for r in range(row_start, row_start + 3):
-            for c in range(col_start, col_start + 3):
-                if omit_cell and r == row and c == col:  # ignore the given cell
-                    continue
-                cell = Cell(r, c, self.board[r][c])
-                cells.append(cell)
+        for r, c in UNIT_COORDS[18 + REGION_OF[row * 9 + col]]:
+            if omit_cell and r == row and c == col:  # ignore the given cell
+                continue
+            cells.append(Cell(r, c, self.get_values(r, c)))
 
         return cells
 
@@ -348,25 +738,24 @@ class Sudoku:
         Return the cells in the given region number
         The regions are numbered 0 through 8, 0 is the upper left, 8 is the lower right
         """
-        if region_num == 0:  # top left
-            return self.get_group(0, 0)
-        elif region_num == 1:
-            return self.get_group(0, 3)  # top mid
-        elif region_num == 2:
-            return self.get_group(0, 6)  # top right
-        elif region_num == 3:
-            return self.get_group(3, 0)  # left mid
-        elif region_num == 4:
-            return self.get_group(3, 3)  # center
-        elif region_num == 5:
-            return self.get_group(3, 6)  # right mid
-        elif region_num == 6:
-            return self.get_group(6, 0)  # bottom left
-        elif region_num == 7:
-            return self.get_group(6, 3)  # bottom mid
-        elif region_num == 8:
-            return self.get_group(6, 6)  # bottom right
-        raise Exception('Invalid region: %d' % region_num)
+        if not 0 <= region_num < 9:
+            raise Exception('Invalid region: %d' % region_num)
+        return self.get_unit(18 + region_num)
+
+    def get_unit(self, unit):
+        """
+        Return the cells in the given unit (see units.py)
+        Units 0-8 are the rows, 9-17 the cols and 18-26 the regions
+        """
+        return [Cell(row, col, self.get_values(row, col)) for row, col in UNIT_COORDS[unit]]
+
+    def get_unit_masks(self, unit):
+        """
+        Yield the candidate mask (see masks.py) of each cell in the given unit, in the order of UNIT_COORDS[unit]
+        Unlike get_unit no Cell objects or value lists are built, the rules use this on every pass
+        """
+        for row, col in UNIT_COORDS[unit]:
+            yield self.get_mask(row, col)
 
     def solve_cell(self, cell: Cell):
         """
@@ -378,46 +767,15 @@ class Sudoku:
         This should be called whenever a number is assigned (remove that number as possible from related cells)
         """
         count = 0
-        row = cell.row
-        col = cell.col
         val = cell.val
 
-        # check row first by checking all cols in target row
-        for neighbor in self.get_row(row, omit_col=col):
-            if val in neighbor.val:
-                self.board[row][neighbor.col].remove(val)
-                # print('Removed ROW possible value of %d at %d,%d' % (val, row, neighbor.col))
-                count += 1
-
-                # added this to debug that board is always in a good state
-                # it will decrease performance, so it should be removed once the
-                # algo has been verified more
-                self.is_board_valid()
-
-        # check col next by checking all rows in target col
-        for neighbor in self.get_col(col, omit_row=row):
-            if val in neighbor.val:
-                self.board[neighbor.row][col].remove(val)
-                # print('Removed COL possible value of %d at %d,%d' % (val, neighbor.row, col))
+        # remove the value from every neighbor in the same row, col and 3x3 region
+        # (a value removed from a solved peer leaves it empty, which status() reports as CONTRADICTION)
+        for row, col in PEER_COORDS[cell.row * 9 + cell.col]:
+            if self.remove_value(row, col, val):
+                # print('Removed possible value of %d at %d,%d' % (val, row, col))
                 count += 1
 
-                # added this to debug that board is always in a good state
-                # it will decrease performance, so it should be removed once the
-                # algo has been verified more
-                self.is_board_valid()
-
-        # find the subgroup for this cell and check all neighbors
-        for neighbor in self.get_group(row, col, omit_cell=True):
-            if val in self.board[neighbor.row][neighbor.col]:
-                self.board[neighbor.row][neighbor.col].remove(val)
-                # print('Removed GROUP possible value of %d at %d,%d' % (val, neighbor.row, neighbor.col))
-                count += 1
-
-                # added this to debug that board is always in a good state
-                # it will decrease performance, so it should be removed once the
-                # algo has been verified more
-                self.is_board_valid()
-
         return count
 
     def init_constraints(self):
@@ -429,7 +787,7 @@ class Sudoku:
         """
         for row in range(9):
             for col in range(9):
-                value = self.board[row][col]
+                value = self.get_values(row, col)
                 if len(value) == 1:  # if number given
                     self.solve_cell(Cell(row, col, value[0]))
 
@@ -440,7 +798,7 @@ class Sudoku:
         """
         values = []
         for col in range(9):
-            values.append(self.board[row][col])
+            values.append(self.get_values(row, col))
 
         return self.is_group_valid(values)
 
@@ -451,7 +809,7 @@ class Sudoku:
         """
         values = []
         for row in range(9):
-            values.append(self.board[row][col])
+            values.append(self.get_values(row, col))
 
         return self.is_group_valid(values)
 
@@ -511,8 +869,8 @@ class Sudoku:
                 return False
 
         # Checks for repeated values in 3x3 grid
-        row_for_small_grid = math.floor(row / 3) * 3
-        col_for_small_grid = math.floor(col / 3) * 3
+        row_for_small_grid = row // 3 * 3
+        col_for_small_grid = col // 3 * 3
         for miniRow in range(0, 3):
             for miniCol in range(0, 3):
                 if board[row_for_small_grid + miniRow][col_for_small_grid + miniCol] == digit:
@@ -541,7 +899,7 @@ class Sudoku:
         for row in range(9):
             this_row = []
             for col in range(9):
-                cell_value = self.board[row][col]
+                cell_value = self.get_values(row, col)
                 if len(cell_value) == 1:
                     this_row.append(cell_value[0])
                 else:
@@ -549,27 +907,24 @@ class Sudoku:
             bt_puzzle.append(this_row)
         return bt_puzzle
 
-    def solve_fixed_baseline_backtrack_entry(self):
+    def solve_fixed_baseline_backtrack_entry(self, max_solutions=1, stats=None, max_nodes=None, deadline=None,
+                                             cancel=None):
         self.bt_puzzle = self.get_bt_puzzle()
-        return self.solve_fixed_baseline_backtrack(0)
-
-    def solve_fixed_baseline_backtrack(self, bt_count):
-        # Format for taking in a board(unsolved) board in the following format: [[row1],[row2],...,[row9]]
-        # puzzle =  self.build_board_from_str(puzzle_2_medium)
-        for row in range(0, 9):
-            for col in range(0, 9):
-                if self.bt_puzzle[row][col] == 0:
-                    for digit in range(1, 10):
-                        if self.is_valid(digit, self.bt_puzzle, row, col):
-                            self.bt_puzzle[row][col] = digit
-                            self.solve_fixed_baseline_backtrack(bt_count)
-                            bt_count = bt_count + 1
-                            self.bt_puzzle[row][col] = 0
-                    return
-        # print(bt_count)
-        # self.printBoard(self.bt_puzzle)
-        self.bt_count = bt_count
-        return
+        return self.solve_fixed_baseline_backtrack(max_solutions, stats, max_nodes, deadline, cancel)
+
+    def solve_fixed_baseline_backtrack(self, max_solutions=1, stats=None, max_nodes=None, deadline=None, cancel=None):
+        """
+        Fixed baseline: fill the blank cells of self.bt_puzzle (see get_bt_puzzle) in row order without inference
+        Stops at the first solution (or after max_solutions) and leaves the first solution in self.bt_puzzle
+        Return the number of solutions found, self.bt_count is the number of backtracks
+        max_nodes, deadline and cancel limit the search (see utility.Budget), self.bt_puzzle is not changed
+        if one is reached
+        """
+        if stats is None:
+            stats = SolveStats()
+        solutions = backtrack_grid(self.bt_puzzle, max_solutions, stats, max_nodes, deadline, cancel)
+        self.bt_count = stats.backtracks
+        return solutions
 
     # def BT_most_constrained_var(self, history: List):
     #     if self.is_board_solved():
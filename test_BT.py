@@ -24,8 +24,8 @@ puzzle =    [
 [0, 9, 0, 0, 0, 0, 4, 0, 0]
 ]
 """
-import math
-
+from fixed_baseline import backtrack_grid
+from utility import SolveStats
 
 
 def printBoard(board):
@@ -34,53 +34,17 @@ def printBoard(board):
             print(board[i][j], end=" ")
         print()
 
-def is_valid(digit, board, row, col):
-    """
-    Checks 3 is value is possible or not with 3 conditions:
-    1. Check repetation in column
-    2. Check repetation in row
-    3. Check repetation in 3x3 grid
 
+def solve_fixed_baseline_backtrack():
     """
-    # Checks for repeated values in column
-    for col_counter in range(0,9):
-        if board[row][col_counter] == digit:
-            return False
-
-    # Checks for repeated values in row
-    for row_counter in range(0,9):
-        if board[row_counter][col] == digit:
-            return False
-
-    # Checks for repeated values in 3x3 grid
-    row_for_small_grid = math.floor(row / 3) * 3
-    col_for_small_grid = math.floor(col / 3) * 3
-    for miniRow in range(0,3):
-        for miniCol in range(0,3):
-            if board[row_for_small_grid + miniRow][col_for_small_grid + miniCol] == digit:
-                return False
-
-    return True
-
-
-def solve_fixed_baseline_backtrack(bt_count):
-    
-    for row in range(0, 9):
-        for col in range(0, 9):
-            if puzzle[row][col] == 0:
+    Solve puzzle in place with the fixed baseline (see fixed_baseline.py), stopping at the first solution
+    """
+    stats = SolveStats()
+    solutions = backtrack_grid(puzzle, stats=stats)
+    print(stats.backtracks)
+    printBoard(puzzle)
+    return solutions
 
-                for digit in range(1, 10):
-                    if is_valid(digit, puzzle, row, col):
-                        puzzle[row][col] = digit
-                        solve_fixed_baseline_backtrack(bt_count)
-                        bt_count = bt_count + 1
-                        puzzle[row][col] = 0
-                    
-                return 
-    print(bt_count)             
-    printBoard(puzzle)               
-    
-    
-    
 
-ans = solve_fixed_baseline_backtrack(0)
+if __name__ == '__main__':
+    ans = solve_fixed_baseline_backtrack()
@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+
+# AI 531 - Sudoku
+# Wadood Alam
+# Joe Nguyen
+# Matthew Pacey
+
+"""
+Index tables for the 81 cells, 27 units and 20 peers of each cell
+Built once at import so callers can iterate them directly without allocating cells
+
+Cells are numbered row * 9 + col (0 is the upper left, 80 is the lower right)
+Units are numbered 0-8 for rows, 9-17 for cols and 18-26 for regions
+Regions are numbered 0 through 8, 0 is the upper left, 8 is the lower right
+"""
+import unittest
+
+COORDS = tuple((index // 9, index % 9) for index in range(81))     # cell index -> (row, col)
+
+ROWS = tuple(tuple(row * 9 + col for col in range(9)) for row in range(9))
+COLS = tuple(tuple(row * 9 + col for row in range(9)) for col in range(9))
+REGIONS = tuple(tuple(row * 9 + col
+                      for row in range(region // 3 * 3, region // 3 * 3 + 3)
+                      for col in range(region % 3 * 3, region % 3 * 3 + 3))
+                for region in range(9))
+UNITS = ROWS + COLS + REGIONS
+
+REGION_OF = tuple((row // 3) * 3 + col // 3 for row, col in COORDS)    # cell index -> region number
+
+# cell index -> (row unit, col unit, region unit)
+CELL_UNITS = tuple((row, 9 + col, 18 + REGION_OF[index]) for index, (row, col) in enumerate(COORDS))
+
+# cell index -> position (0-8) of the cell within each of its 3 units, in the same order as CELL_UNITS
+CELL_UNIT_POSITIONS = tuple((col, row, (row % 3) * 3 + col % 3) for row, col in COORDS)
+
+# cell index -> every other cell in the same row, col or region (row, then col, then rest of region)
+PEERS = tuple(tuple([other for other in ROWS[row] if other != index] +
+                    [other for other in COLS[col] if other != index] +
+                    [other for other in REGIONS[REGION_OF[index]] if COORDS[other][0] != row and COORDS[other][1] != col])
+              for index, (row, col) in enumerate(COORDS))
+
+# same tables using (row, col) tuples for callers that index board[row][col]
+UNIT_COORDS = tuple(tuple(COORDS[index] for index in unit) for unit in UNITS)
+PEER_COORDS = tuple(tuple(COORDS[index] for index in peers) for peers in PEERS)
+
+
+def cell_index(row, col):
+    """
+    Return the index used by the tables for the cell at row,col
+    """
+    return row * 9 + col
+
+
+def unit_cells(unit):
+    """
+    Return the (row, col) positions of the 9 cells in the given unit (0-26)
+    """
+    return UNIT_COORDS[unit]
+
+
+def peers(row, col):
+    """
+    Return the (row, col) positions of the 20 peers of the cell at row,col
+    """
+    return PEER_COORDS[row * 9 + col]
+
+
+def units_of(row, col):
+    """
+    Return the 3 unit numbers (row, col, region) that contain the cell at row,col
+    """
+    return CELL_UNITS[row * 9 + col]
+
+
+class TestUnits(unittest.TestCase):
+    def test_peers(self):
+        """
+        Every cell has 20 distinct peers and shares exactly 3 units with itself
+        """
+        for index in range(81):
+            self.assertEqual(20, len(set(PEERS[index])))
+            self.assertNotIn(index, PEERS[index])
+            self.assertEqual(3, sum(1 for unit in UNITS if index in unit))
+            for unit, position in zip(CELL_UNITS[index], CELL_UNIT_POSITIONS[index]):
+                self.assertEqual(index, UNITS[unit][position])
+
+    def test_region(self):
+        # region 4 is the center 3x3 group
+        self.assertEqual(((3, 3), (3, 4), (3, 5), (4, 3), (4, 4), (4, 5), (5, 3), (5, 4), (5, 5)), unit_cells(22))
+        self.assertEqual((4, 13, 22), units_of(4, 4))
+        self.assertEqual(set(PEER_COORDS[0]), set(peers(0, 0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,25 +1,166 @@
-counter = 0
+import time
+import unittest
+from collections import defaultdict
 
+# returned by the solvers (instead of a board or -1) when the search stopped at a limit (see Budget)
+BUDGET_EXCEEDED = -2
 
-class RuleTracker():
+
+class SolveStats:
+    """
+    Statistics for a single solve, passed to the solvers (and from them to the inference rules)
+    Each solve gets its own object so several solves can run at the same time
+
+    nodes:          search nodes visited (boards expanded by search.Search or the solver's own search)
+    backtracks:     values that were tried and undone
+    max_depth:      deepest search node (0 is the starting board)
+    rule_moves:     rule name -> moves made by the rule (as returned by InferenceRule.evaluate)
+    rule_fires:     rule name -> times the rule changed the board
+    rule_eliminations: rule name -> possible values removed by the rule
+    rule_time:      rule name -> seconds spent in the rule
+    elapsed:        seconds spent in the solver
+    exceeded:       the limit that stopped the solve ('max_nodes', 'deadline' or 'cancelled'), None if there was none
+    """
 
     def __init__(self):
-        self.naked_singles = 0
-        self.hidden_singles = 0
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.rule_moves = defaultdict(int)
+        self.rule_fires = defaultdict(int)
+        self.rule_eliminations = defaultdict(int)
+        self.rule_time = defaultdict(float)
+        self.elapsed = 0.
+        self.exceeded = None
+        self.start_time = None
+
+    def start(self):
+        """
+        Start timing the solve
+        """
+        self.start_time = time.perf_counter()
+
+    def stop(self):
+        """
+        Stop timing the solve, elapsed is the total of all start/stop periods
+        """
+        if self.start_time is not None:
+            self.elapsed += time.perf_counter() - self.start_time
+            self.start_time = None
+
+    def record_node(self, depth):
+        """
+        Count a search node at the given depth
+        """
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
 
-        self.naked_pairs = 0
-        self.hidden_pairs = 0
+    def record_backtrack(self):
+        self.backtracks += 1
 
-        self.naked_triples = 0
-        self.hidden_triples = 0
+    def record_rule(self, name, moves, eliminations, elapsed):
+        """
+        Called by InferenceRule.apply after each run of a rule
+        """
+        self.rule_moves[name] += moves
+        self.rule_eliminations[name] += eliminations
+        self.rule_time[name] += elapsed
+        if eliminations:
+            self.rule_fires[name] += 1
 
-    def reset(self):
-        self.__init__()
+    @property
+    def eliminations(self):
+        """
+        Possible values removed by all rules
+        """
+        return sum(self.rule_eliminations.values())
 
     def __repr__(self):
-        return f'ns = {self.naked_singles}, hs = {self.hidden_singles} ' \
-               f'np = {self.naked_pairs}, hp = {self.hidden_pairs} ' \
-               f'nt = {self.naked_singles}, ht = {self.naked_triples} '
+        return f'nodes = {self.nodes}, backtracks = {self.backtracks}, max depth = {self.max_depth}, ' \
+               f'time = {self.elapsed:.4f}s, moves = {dict(self.rule_moves)}'
+
+
+class CancelToken:
+    """
+    Passed to a solver so another thread (or a callback) can stop it, the solver checks it at every search node
+    """
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Budget:
+    """
+    Limits for one solve, each one is off when None
+    max_nodes:  search nodes the solver may visit (see SolveStats.nodes)
+    deadline:   time.monotonic() time the solver has to stop by
+    cancel:     CancelToken that stops the solver once cancelled
+
+    Every solver takes these as its max_nodes, deadline and cancel arguments and checks them before each
+    search node. When one is reached the solver returns BUDGET_EXCEEDED (instead of a board, -1 or a count),
+    the stats passed in have the counters up to that point and stats.exceeded names the limit
+    """
+
+    def __init__(self, max_nodes=None, deadline=None, cancel: CancelToken = None):
+        self.max_nodes = max_nodes
+        self.deadline = deadline
+        self.cancel = cancel
+
+    def check(self, stats: SolveStats):
+        """
+        Called by the solvers before each search node
+        Return False if a limit has been reached (and record which one in stats.exceeded), else True
+        """
+        if self.max_nodes is not None and stats.nodes >= self.max_nodes:
+            stats.exceeded = 'max_nodes'
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            stats.exceeded = 'deadline'
+        elif self.cancel is not None and self.cancel.cancelled:
+            stats.exceeded = 'cancelled'
+        else:
+            return True
+        return False
+
+
+class TestSolveStats(unittest.TestCase):
+    def test_record(self):
+        stats = SolveStats()
+        stats.record_node(0)
+        stats.record_node(3)
+        stats.record_node(1)
+        stats.record_rule('naked_pairs', 2, 5, 0.1)
+        stats.record_rule('naked_pairs', 0, 0, 0.1)
+        stats.record_rule('hidden_pairs', 1, 1, 0.1)
+
+        self.assertEqual(3, stats.nodes)
+        self.assertEqual(3, stats.max_depth)
+        self.assertEqual(2, stats.rule_moves['naked_pairs'])
+        self.assertEqual(1, stats.rule_fires['naked_pairs'])
+        self.assertEqual(6, stats.eliminations)
+        self.assertEqual(0, stats.rule_moves['naked_triples'])
+
+    def test_budget(self):
+        stats = SolveStats()
+        stats.record_node(0)
+        self.assertTrue(Budget().check(stats))
+        self.assertTrue(Budget(max_nodes=2).check(stats))
+        self.assertIsNone(stats.exceeded)
+        self.assertFalse(Budget(max_nodes=1).check(stats))
+        self.assertEqual('max_nodes', stats.exceeded)
+        self.assertFalse(Budget(deadline=time.monotonic()).check(stats))
+        self.assertEqual('deadline', stats.exceeded)
+
+        token = CancelToken()
+        budget = Budget(cancel=token)
+        self.assertTrue(budget.check(stats))
+        token.cancel()
+        self.assertFalse(budget.check(stats))
+        self.assertEqual('cancelled', stats.exceeded)
 
 
-rule_tracker = RuleTracker()
+if __name__ == '__main__':
+    unittest.main()